@@ -18,21 +18,40 @@ def create_app():
     db.init_app(app)
     api = Api(app)  # Initialize Flask-RESTful
 
+    from .serialization import init_app as init_serialization
+    init_serialization(app, api)  # Fast JSON encoding, gzip and ETags
+
     # Register RESTful resources
     from .api.quote import QuoteResource
+    from .api.chart import ChartResource
     from .api.portfolio import PortfolioResource
+    from .api.simulate import PortfolioSimulationResource
     from .api.transaction import TransactionResource
     from .api.user import UserResource
     from .api.symbol_search import SymbolSearchResource
+    from .api.status import StatusResource
+    from .api.screener import ScreenerResource
     api.add_resource(QuoteResource, '/api/quote/<string:ticker>')
+    api.add_resource(ChartResource, '/api/quote/<string:ticker>/chart')
     api.add_resource(PortfolioResource, '/api/portfolio/<int:portfolio_id>')
+    api.add_resource(PortfolioSimulationResource, '/api/portfolio/<int:portfolio_id>/simulate')
     api.add_resource(TransactionResource, '/api/transaction')
     api.add_resource(UserResource, '/api/user/<int:user_id>')
     api.add_resource(SymbolSearchResource, '/api/symbol-search')
+    api.add_resource(StatusResource, '/api/status')
+    api.add_resource(ScreenerResource, '/api/screener')
+
+    from .commands import register_commands
+    register_commands(app)
+
+    # Create database tables only when asked to; normally run `flask --app app init-schema`
+    if app.config["AUTO_CREATE_SCHEMA"]:
+        with app.app_context():
+            from . import models  # Import models so they are registered with SQLAlchemy
+            db.create_all()
 
-    # Create database tables
-    with app.app_context():
-        from . import models  # Import models so they are registered with SQLAlchemy
-        db.create_all()
+    if app.config["STARTUP_MODE"] == "preload":
+        from .startup import preload
+        preload()
 
-    return app
\ No newline at end of file
+    return app
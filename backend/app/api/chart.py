@@ -0,0 +1,122 @@
+from flask import request
+from flask_restful import Resource
+
+from app.api.quote import (
+    busy_response, cache_when_done, fetcher, result_or_stale, stock_cache, StockDataCache, UpstreamBusyError
+)
+from app.config import Config
+from app.upstream import Priority
+
+DEFAULT_POINTS = 300
+MAX_POINTS = 5000
+
+# Short ranges use intraday bars; a daily series would be one or five points
+INTRADAY = {
+    "1d": "1m",
+    "5d": "5m",
+}
+
+# How much of the full daily history each longer range covers
+RANGES = {
+    "1d": None,  # intraday, see INTRADAY
+    "5d": None,
+    "1m": {"months": 1},
+    "1y": {"years": 1},
+    "5y": {"years": 5},
+    "max": {},
+}
+
+# Chart bars keyed by (symbol, range) for intraday and (symbol, "max") for daily history
+history_cache = StockDataCache(ttl_seconds=60)
+
+
+def _quote_history_max(symbol, stale=False):
+    # A full quote already holds the daily history; charts never wait on its `info` call
+    full = stock_cache.get_stale(symbol) if stale else stock_cache.get(symbol)
+    return full["history_max"] if full else None
+
+
+def fetch_chart_history(symbol, chart_range):
+    """Bars for `chart_range`: intraday for short ranges, the full daily history otherwise."""
+    if chart_range in INTRADAY:
+        period, interval = chart_range, INTRADAY[chart_range]
+    else:
+        hist = _quote_history_max(symbol)
+        if hist is not None:
+            return hist
+        period, interval = "max", "1d"
+
+    key = (symbol.upper(), period)
+    cached = history_cache.get(key)
+    if cached is not None:
+        return cached
+
+    future = fetcher.submit_history(symbol, period, Priority.QUOTE, interval=interval)
+    future.add_done_callback(cache_when_done(history_cache, key))
+
+    def stale():
+        hist = history_cache.get_stale(key)
+        if hist is None and period == "max":
+            hist = _quote_history_max(symbol, stale=True)
+        return hist
+
+    return result_or_stale(future, Config.UPSTREAM_WAIT_TIMEOUT, stale, symbol)
+
+
+def slice_history(hist, chart_range):
+    window = RANGES[chart_range]
+    if not window or hist.empty:
+        return hist
+
+    import pandas as pd  # already loaded by yfinance
+    start = hist.index[-1] - pd.DateOffset(**window)
+    return hist[hist.index >= start]
+
+
+class ChartResource(Resource):
+    def get(self, ticker):
+        chart_range = request.args.get("range", "1d")
+        method = request.args.get("method", "lttb")
+        if chart_range not in RANGES:
+            return {"error": f"Invalid range. Use one of: {', '.join(RANGES)}"}, 400
+
+        # numpy is only needed once a chart is requested
+        from app.downsample import downsample, METHODS
+        if method not in METHODS:
+            return {"error": f"Invalid method. Use one of: {', '.join(METHODS)}"}, 400
+
+        try:
+            points = int(request.args.get("points", DEFAULT_POINTS))
+        except ValueError:
+            return {"error": "points must be an integer"}, 400
+        points = max(3, min(points, MAX_POINTS))
+
+        try:
+            hist = fetch_chart_history(ticker, chart_range)
+        except UpstreamBusyError:
+            return busy_response()
+        if hist is None:
+            return {"error": "Failed to fetch stock data"}, 500
+
+        hist = slice_history(hist, chart_range)
+        hist = hist[hist["Close"].notna()]
+        if hist.empty:
+            return {"error": f"Ticker = {ticker} not found"}, 404
+
+        # Epoch milliseconds: compact and directly usable by JS Date
+        timestamps = hist.index.as_unit("ms").asi8
+        closes = hist["Close"].to_numpy(dtype="float64")
+        volumes = hist["Volume"].fillna(0).to_numpy(dtype="float64")
+
+        idx = downsample(timestamps, closes, points, method)
+
+        return {
+            "symbol": ticker.upper(),
+            "range": chart_range,
+            "method": method,
+            "source_points": len(closes),
+            # numpy arrays are encoded directly by app.serialization
+            "timestamps": timestamps[idx],
+            "prices": closes[idx].round(4),
+            "volume": volumes[idx].astype("int64")
+        }
@@ -1,7 +1,13 @@
 from flask_restful import Resource
 from flask import request
 from app.models import db, Portfolio, Holding
-from app.api.quote import QuoteResource
+from app.api.quote import fetch_current_prices
+from app.upstream import Priority
+from app.serialization import columnar, wants_columns
+
+# Holding.to_dict() plus the live price, for columnar responses of empty portfolios
+HOLDING_FIELDS = ("id", "portfolio_id", "symbol", "shares", "avg_price", "last_updated",
+                  "product_type", "current_price")
 
 class PortfolioResource(Resource):
     def get(self, portfolio_id):
@@ -12,8 +18,11 @@ class PortfolioResource(Resource):
         holdings = Holding.query.filter_by(portfolio_id=portfolio.id).all()
         holdings_data = []
 
+        # All symbols are fetched concurrently instead of one upstream round trip per holding
+        live_prices = fetch_current_prices([h.product_symbol for h in holdings], priority=Priority.PORTFOLIO)
+
         for holding in holdings:
-            live_price = QuoteResource.get_current_price(holding.product_symbol)
+            live_price = live_prices.get(holding.product_symbol)
 
             holding_dict = holding.to_dict()
             if live_price is not None:
@@ -24,8 +33,8 @@ class PortfolioResource(Resource):
         return {
             "id": portfolio.id,
             "name": portfolio.name,
-            "created_at": portfolio.created_at.isoformat(),
-            "holdings": holdings_data
+            "created_at": portfolio.created_at,
+            "holdings": columnar(holdings_data, HOLDING_FIELDS) if wants_columns() else holdings_data
         }
         
     def post(self):
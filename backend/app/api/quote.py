@@ -1,9 +1,14 @@
-import yfinance as yf
 from flask_restful import Resource
-from requests.exceptions import HTTPError
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta, timezone
 import math
 import threading
+import time
+
+from app.async_fetcher import AsyncQuoteFetcher
+from app.config import Config
+from app.startup import get_yfinance, get_if_loaded
+from app.upstream import UpstreamScheduler, Priority, RateLimitedError
 
 class StockDataCache:
     def __init__(self, ttl_seconds=60):
@@ -18,40 +23,212 @@ class StockDataCache:
                 return entry["data"]
             return None
 
+    def get_stale(self, symbol):
+        # Expired entries are kept so we can degrade gracefully when upstream is slow
+        with self.lock:
+            entry = self.data.get(symbol)
+            return entry["data"] if entry else None
+
     def set(self, symbol, data):
         with self.lock:
             self.data[symbol] = {"data": data, "timestamp": datetime.now(timezone.utc)}
 
 stock_cache = StockDataCache(ttl_seconds=60)
+# 1-day history only, for price lookups that do not need the full quote
+price_cache = StockDataCache(ttl_seconds=60)
 
-def fetch_full_stock_data(symbol):
-    cached = stock_cache.get(symbol)
-    if cached:
-        return cached
+upstream = UpstreamScheduler(
+    rate=Config.UPSTREAM_RATE,
+    burst=Config.UPSTREAM_BURST,
+    workers=Config.UPSTREAM_WORKERS,
+    max_retries=Config.UPSTREAM_MAX_RETRIES,
+)
+
+# Shares the scheduler's token bucket so both stay within one upstream budget
+fetcher = AsyncQuoteFetcher(
+    upstream.bucket,
+    max_in_flight=Config.ASYNC_MAX_IN_FLIGHT,
+    timeout=Config.ASYNC_HTTP_TIMEOUT,
+    max_retries=Config.UPSTREAM_MAX_RETRIES,
+)
 
-    try:
-        stock = yf.Ticker(symbol)
 
-        info = stock.info or {}
-        fast_info = stock.fast_info or {}
-        hist_1d = stock.history(period="1d")
-        hist_max = stock.history(period="max")
+class UpstreamBusyError(Exception):
+    """Upstream is rate limiting or too slow and there is no cached data to fall back on."""
 
-        result = {
-            "info": info,
-            "fast_info": fast_info,
-            "history_1d": hist_1d,
-            "history_max": hist_max,
-        }
 
-        stock_cache.set(symbol, result)
-        return result
+def busy_response():
+    return {"error": "Market data is busy. Please try again shortly."}, 503, {"Retry-After": "5"}
+
+
+def cache_when_done(cache, key):
+    """Done-callback that stores a Future's successful result in `cache`."""
+    def callback(future):
+        if not future.cancelled() and future.exception() is None:
+            cache.set(key, future.result())
+    return callback
+
+
+def result_or_stale(future, timeout, stale, symbol):
+    """
+    Wait up to `timeout` for `future`. If it fails or is late, return `stale()`
+    (an expired cache entry) instead, while a slow fetch keeps running and
+    refreshes the cache when done. With nothing cached, timeouts and 429s raise
+    UpstreamBusyError and other errors return None.
+    """
+    try:
+        return future.result(timeout=timeout)
 
     except Exception as e:
+        fallback = stale()
+        if fallback is not None:
+            return fallback
+        if isinstance(e, (FutureTimeoutError, RateLimitedError)):
+            raise UpstreamBusyError(f"Upstream unavailable for {symbol}") from e
         print(f"Error fetching data for {symbol}: {e}")
         return None
 
 
+def _fetch_info(symbol):
+    stock = get_yfinance().Ticker(symbol)
+    return stock.info or {}, stock.fast_info or {}
+
+
+def _store_stock_data(symbol, info, fast_info, hist_1d, hist_max):
+    result = {
+        "info": info,
+        "fast_info": fast_info,
+        "history_1d": hist_1d,
+        "history_max": hist_max,
+    }
+
+    stock_cache.set(symbol, result)
+    price_cache.set(symbol, hist_1d)
+
+    # Keep the screener table warm with data we fetched anyway
+    fundamentals = get_if_loaded("fundamentals")
+    if fundamentals is not None:
+        fundamentals.update_from_info(symbol, info)
+    return result
+
+
+_full_downloads = {}
+_full_downloads_lock = threading.Lock()
+
+
+def submit_full_stock_data(symbol, priority=Priority.QUOTE):
+    """
+    Start downloading info and both histories for `symbol`; returns a Future for
+    the combined result. Only the yfinance `info` call occupies a scheduler
+    worker, the histories run on the async fetcher, and concurrent callers for
+    the same symbol share one download.
+    """
+    with _full_downloads_lock:
+        future = _full_downloads.get(symbol)
+        if future is not None:
+            return future
+        future = Future()
+        _full_downloads[symbol] = future
+
+    try:
+        parts = [
+            upstream.submit(("quote-info", symbol), lambda: _fetch_info(symbol), priority),
+            fetcher.submit_history(symbol, "1d", priority),
+            fetcher.submit_history(symbol, "max", priority),
+        ]
+    except Exception as e:
+        with _full_downloads_lock:
+            _full_downloads.pop(symbol, None)
+        future.set_exception(e)
+        return future
+    remaining = [len(parts)]
+
+    def part_done(_):
+        with _full_downloads_lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+            _full_downloads.pop(symbol, None)
+        try:
+            (info, fast_info), hist_1d, hist_max = (part.result() for part in parts)
+            future.set_result(_store_stock_data(symbol, info, fast_info, hist_1d, hist_max))
+        except Exception as e:
+            future.set_exception(e)
+
+    for part in parts:
+        part.add_done_callback(part_done)
+    return future
+
+
+def fetch_full_stock_data_many(symbols, priority=Priority.QUOTE):
+    """
+    Full quote data for each symbol ({symbol: data or None}). Cache misses are
+    downloaded concurrently and share one UPSTREAM_WAIT_TIMEOUT; raises
+    UpstreamBusyError if any symbol is neither back in time nor cached.
+    """
+    results, pending = {}, {}
+    for symbol in dict.fromkeys(symbols):
+        cached = stock_cache.get(symbol)
+        if cached:
+            results[symbol] = cached
+        else:
+            pending[symbol] = submit_full_stock_data(symbol, priority)
+
+    deadline = time.monotonic() + Config.UPSTREAM_WAIT_TIMEOUT
+    for symbol, future in pending.items():
+        results[symbol] = result_or_stale(
+            future, max(0.0, deadline - time.monotonic()), lambda s=symbol: stock_cache.get_stale(s), symbol
+        )
+    return results
+
+
+def fetch_full_stock_data(symbol, priority=Priority.QUOTE):
+    return fetch_full_stock_data_many([symbol], priority)[symbol]
+
+
+def _last_close(hist):
+    if hist is None or hist.empty:
+        return None
+    return float(hist["Close"].iloc[-1])
+
+
+def _stale_history_1d(symbol):
+    stale = stock_cache.get_stale(symbol)
+    return stale["history_1d"] if stale else price_cache.get_stale(symbol)
+
+
+def fetch_current_prices(symbols, priority=Priority.QUOTE, timeout=None):
+    """
+    Latest close for each symbol. Cache misses are fetched concurrently on the
+    async fetcher; anything not back within `timeout` falls back to stale data
+    (or None) while its fetch finishes in the background.
+    """
+    timeout = Config.PRICE_WAIT_TIMEOUT if timeout is None else timeout
+    prices, pending = {}, {}
+
+    for symbol in set(symbols):
+        full = stock_cache.get(symbol)
+        hist = full["history_1d"] if full else price_cache.get(symbol)
+        if hist is not None:
+            prices[symbol] = _last_close(hist)
+            continue
+        future = fetcher.submit_history(symbol, "1d", priority)
+        future.add_done_callback(cache_when_done(price_cache, symbol))
+        pending[symbol] = future
+
+    deadline = time.monotonic() + timeout
+    for symbol, future in pending.items():
+        try:
+            hist = result_or_stale(
+                future, max(0.0, deadline - time.monotonic()), lambda s=symbol: _stale_history_1d(s), symbol
+            )
+        except UpstreamBusyError:
+            hist = None
+        prices[symbol] = _last_close(hist)
+
+    return prices
+
+
 def format_market_cap(market_cap):
     if market_cap is None:
         return None
@@ -75,7 +252,7 @@ def format_volume(volume):
 class QuoteResource(Resource):
     def get(self, ticker):
         try:
-            data = fetch_full_stock_data(ticker)
+            data = fetch_full_stock_data(ticker, priority=Priority.QUOTE)
             if not data:
                 return {"error": "Failed to fetch stock data"}, 500
 
@@ -89,8 +266,8 @@ class QuoteResource(Resource):
             dividends = hist_max["Dividends"]
             last_dividend = dividends[dividends != 0].iloc[-1] if not dividends[dividends != 0].empty else 0
 
-            close_prices = hist["Close"].tolist()
-            volume_data = hist["Volume"].tolist()
+            close_prices = hist["Close"].to_numpy()
+            volume_data = hist["Volume"].to_numpy()
             price = close_prices[-1]
             open_price = hist["Open"].iloc[-1]
             volume = volume_data[-1]
@@ -111,21 +288,12 @@ class QuoteResource(Resource):
                 "chart_volume": volume_data
             }
 
-        except HTTPError as e:
-            if e.response.status_code == 429:
-                return {"error": "Rate limit exceeded. Please try again later."}, 429
-            return {"error": str(e)}, 500
+        except UpstreamBusyError:
+            return busy_response()
 
     @staticmethod
-    def get_current_price(ticker):
-        data = fetch_full_stock_data(ticker)
-        if not data:
-            return None
-
+    def get_current_price(ticker, priority=Priority.QUOTE):
         try:
-            hist = data["history_1d"]
-            if hist.empty:
-                return None
-            return float(hist["Close"].iloc[-1])
+            return fetch_current_prices([ticker], priority=priority).get(ticker)
         except Exception:
             return None
@@ -0,0 +1,65 @@
+from flask import request
+from flask_restful import Resource
+
+from app.serialization import columnar, wants_columns
+
+MAX_PAGE_SIZE = 200
+
+# query parameter prefix -> table column, e.g. min_market_cap / max_market_cap
+RANGE_FILTERS = ("market_cap", "pe_ratio", "price", "dividend_yield")
+SORT_FIELDS = ("symbol", "name", "market_cap", "pe_ratio", "price", "dividend_yield")
+
+
+def _float_arg(name):
+    value = request.args.get(name)
+    return float(value) if value not in (None, "") else None
+
+
+class ScreenerResource(Resource):
+    def get(self):
+        # numpy is only needed once the screener is used
+        from app.fundamentals import get_fundamentals, start_refresher
+
+        sort = request.args.get("sort", "market_cap")
+        if sort not in SORT_FIELDS:
+            return {"error": f"Invalid sort. Use one of: {', '.join(SORT_FIELDS)}"}, 400
+
+        try:
+            ranges = {}
+            for field in RANGE_FILTERS:
+                low, high = _float_arg(f"min_{field}"), _float_arg(f"max_{field}")
+                if low is not None or high is not None:
+                    ranges[field] = (low, high)
+            page = max(int(request.args.get("page", 1)), 1)
+            page_size = min(max(int(request.args.get("page_size", 50)), 1), MAX_PAGE_SIZE)
+        except ValueError as e:
+            return {"error": f"Invalid input: {str(e)}"}, 400
+
+        sectors = {s.strip().lower() for s in request.args.get("sector", "").split(",") if s.strip()}
+        descending = request.args.get("order", "desc") != "asc"
+
+        table = get_fundamentals()
+        start_refresher()
+        total, columns = table.screen(
+            sectors=sectors,
+            ranges=ranges,
+            sort=sort,
+            descending=descending,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+        )
+
+        columns.pop("updated_at")
+        columns = {field: values.tolist() for field, values in columns.items()}
+        rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        for row in rows:
+            for field, value in row.items():
+                if isinstance(value, float) and value != value:  # NaN -> null
+                    row[field] = None
+
+        return {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "results": columnar(rows, columns) if wants_columns() else rows
+        }
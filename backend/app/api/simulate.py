@@ -0,0 +1,106 @@
+import math
+
+from flask import request
+from flask_restful import Resource
+
+from app.api.quote import busy_response, fetch_full_stock_data_many, UpstreamBusyError
+from app.models import Portfolio, Holding
+from app.upstream import Priority
+
+# Volatility needs at least two daily returns
+MIN_LOOKBACK = 2
+MAX_LOOKBACK = 5 * 252
+
+
+def _market_data(data):
+    """Last close and daily close history from a full quote."""
+    if not data or data["history_1d"].empty:
+        return None, None
+    closes = data["history_max"]["Close"]
+    if closes.index.tz is not None:
+        # Dates only, so series from different exchanges line up
+        closes = closes.set_axis(closes.index.tz_localize(None).normalize())
+    return float(data["history_1d"]["Close"].iloc[-1]), closes
+
+
+class PortfolioSimulationResource(Resource):
+    def post(self, portfolio_id):
+        # numpy/pandas are only needed once a simulation is requested
+        import numpy as np
+        from app.simulation import simulate, orders_for_targets
+
+        portfolio = Portfolio.query.get(portfolio_id)
+        if not portfolio:
+            return {"error": "Portfolio not found"}, 404
+
+        data = request.get_json() or {}
+        targets = data.get("target_weights")
+        trades = data.get("trades")
+        if (targets is None) == (trades is None):
+            return {"error": "Provide either target_weights or trades"}, 400
+
+        lookback = data.get("lookback_days", 252)
+        if isinstance(lookback, bool) or not isinstance(lookback, int) or not MIN_LOOKBACK <= lookback <= MAX_LOOKBACK:
+            return {"error": f"lookback_days must be an integer between {MIN_LOOKBACK} and {MAX_LOOKBACK}"}, 400
+        fractional = data.get("fractional", False)
+        if not isinstance(fractional, bool):
+            return {"error": "fractional must be true or false"}, 400
+
+        try:
+            if targets is not None:
+                targets = {symbol.upper(): float(w) for symbol, w in targets.items()}
+                if not all(math.isfinite(w) for w in targets.values()):
+                    return {"error": "Target weights must be finite numbers"}, 400
+                if any(w < 0 for w in targets.values()) or sum(targets.values()) > 1 + 1e-9:
+                    return {"error": "Target weights must be non-negative and sum to at most 1"}, 400
+            else:
+                if any(t["action"] not in ("BUY", "SELL") for t in trades):
+                    return {"error": "Unsupported transaction type"}, 400
+                if not all(math.isfinite(float(t["qty"])) for t in trades):
+                    return {"error": "Trade quantities must be finite numbers"}, 400
+                if any(float(t["qty"]) <= 0 for t in trades):
+                    return {"error": "Trade quantities must be positive"}, 400
+                # Hypothetical trades are filled at the cached market price
+                trades = [
+                    {
+                        "symbol": t["symbol"].upper(),
+                        "qty": float(t["qty"]) * (1 if t["action"] == "BUY" else -1),
+                    }
+                    for t in trades
+                ]
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            return {"error": f"Invalid input: {str(e)}"}, 400
+
+        holdings = Holding.query.filter_by(portfolio_id=portfolio.id).all()
+        held = {h.product_symbol: float(h.qty) for h in holdings}
+        wanted = targets.keys() if targets is not None else [t["symbol"] for t in trades]
+        symbols = sorted(set(held) | set(wanted))
+
+        # Cache misses are downloaded concurrently
+        try:
+            quotes = fetch_full_stock_data_many(symbols, priority=Priority.QUOTE)
+        except UpstreamBusyError:
+            return busy_response()
+
+        prices, histories = {}, {}
+        for symbol in symbols:
+            prices[symbol], histories[symbol] = _market_data(quotes[symbol])
+        missing = [s for s in symbols if prices[s] is None]
+        if missing:
+            return {"error": f"Could not retrieve market price for {', '.join(missing)}"}, 400
+
+        qty = np.array([held.get(s, 0.0) for s in symbols])
+        price = np.array([prices[s] for s in symbols])
+        cash = float(portfolio.user.balance)
+
+        if targets is not None:
+            weights = np.array([targets.get(s, 0.0) for s in symbols])
+            delta = orders_for_targets(qty, price, cash, weights, fractional)
+        else:
+            position = {s: i for i, s in enumerate(symbols)}
+            delta = np.zeros(len(symbols))
+            idx = np.array([position[t["symbol"]] for t in trades], dtype=int)
+            np.add.at(delta, idx, [t["qty"] for t in trades])
+
+        result = simulate(symbols, qty, price, cash, histories, delta, lookback)
+        return {"portfolio_id": portfolio.id, **result}
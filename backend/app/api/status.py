@@ -0,0 +1,11 @@
+from flask_restful import Resource
+from app.api.quote import upstream, fetcher
+from app.startup import load_timings
+
+class StatusResource(Resource):
+    def get(self):
+        return {
+            "upstream": upstream.stats(),
+            "async_fetcher": fetcher.stats(),
+            "startup": {"load_seconds": load_timings}
+        }
@@ -4,19 +4,33 @@ from cachetools import TTLCache
 from flask import request
 from flask_restful import Resource
 
+from app.serialization import columnar, wants_columns
+from app.startup import load_once
+
+MATCH_FIELDS = ("symbol", "name")
+
 # Cache (max 100 items, 60 sec TTL)
 symbol_cache = TTLCache(maxsize=100, ttl=60)
 
 # Load local ticker data
 TICKERS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "tickers.json")
-with open(TICKERS_PATH, encoding="utf-8") as f:
-    local_tickers = json.load(f)
+
+
+def _read_tickers():
+    with open(TICKERS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_local_tickers():
+    # Parsed on first search (or by startup preload), not at import time
+    return load_once("tickers", _read_tickers)
+
 
 class SymbolSearchResource(Resource):
     def get(self):
         query = request.args.get("q", "").strip().lower()
         if not query:
-            return {"matches": []}, 200
+            return {"matches": columnar([], MATCH_FIELDS) if wants_columns() else []}, 200
 
         # Check local cache (by prefix)
         for i in range(len(query), 0, -1):
@@ -26,7 +40,7 @@ class SymbolSearchResource(Resource):
                     match for match in symbol_cache[prefix]
                     if query in match["symbol"].lower() or query in match["name"].lower()
                 ]
-                return {"matches": filtered}, 200
+                return {"matches": columnar(filtered, MATCH_FIELDS) if wants_columns() else filtered}, 200
 
         # Local ticker search
         local_matches = [
@@ -34,8 +48,8 @@ class SymbolSearchResource(Resource):
                 "symbol": t["ticker"],
                 "name": t["name"]
             }
-            for t in local_tickers
+            for t in get_local_tickers()
             if query in t["ticker"].lower() or query in t["name"].lower()
         ]
         symbol_cache[query] = local_matches
-        return {"matches": local_matches}, 200
+        return {"matches": columnar(local_matches, MATCH_FIELDS) if wants_columns() else local_matches}, 200
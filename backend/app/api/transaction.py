@@ -1,4 +1,5 @@
 from app.api.quote import QuoteResource
+from app.upstream import Priority
 from flask_restful import Resource
 from flask import request
 from app.models import db, Portfolio, Transaction, Holding, User, ProductType, TransactionType
@@ -83,7 +84,7 @@ class TransactionResource(Resource):
         return {'user': user, 'portfolio': portfolio}, 200
 
     def _validate_price_against_market(self, symbol, user_price):
-        market_price = QuoteResource.get_current_price(symbol)
+        market_price = QuoteResource.get_current_price(symbol, priority=Priority.TRADE)
         if market_price is None:
             return {'error': f"Could not retrieve market price for {symbol}"}, 400
 
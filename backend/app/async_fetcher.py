@@ -0,0 +1,177 @@
+"""
+Asynchronous price/history fetcher.
+
+An asyncio event loop runs on a background thread with one connection-pooled
+httpx client, so a single WSGI worker can keep hundreds of chart requests in
+flight. Sync code (Flask resources, quote downloads) gets concurrent.futures
+Futures back and waits on them with its own timeout.
+
+Requests wait for tokens in the same prioritized queue as UpstreamScheduler
+jobs (see TokenBucket.request), and concurrent requests for the same bars
+share one fetch. Company `info` still goes through yfinance,
+because that endpoint needs its cookie/crumb handshake.
+"""
+import asyncio
+import os
+import threading
+import time
+
+from app.upstream import Priority, RateLimitedError, backoff_delay
+
+CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+# yfinance's own lower bound for period="max"
+MAX_PERIOD_START = -2208994789
+
+
+def chart_frame(payload, intraday=False):
+    """
+    Turn a v8 chart response into the DataFrame shape yfinance's history() returns.
+    Daily bars are indexed by date; `intraday` bars keep their bar start time.
+    """
+    import pandas as pd  # deferred like yfinance itself, see app.startup
+
+    result = (payload.get("chart") or {}).get("result") or []
+    if not result or not result[0].get("timestamp"):
+        return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume", "Dividends"])
+
+    result = result[0]
+    tz = result["meta"].get("exchangeTimezoneName") or "UTC"
+    quote = result["indicators"]["quote"][0]
+    index = pd.to_datetime(result["timestamp"], unit="s", utc=True).tz_convert(tz)
+    if not intraday:
+        index = index.normalize()
+    frame = pd.DataFrame(
+        {column.capitalize(): quote.get(column) for column in ("open", "high", "low", "close", "volume")},
+        index=index,
+    )
+
+    dividends = (result.get("events") or {}).get("dividends") or {}
+    amounts = pd.Series(
+        [d["amount"] for d in dividends.values()],
+        index=pd.to_datetime([d["date"] for d in dividends.values()], unit="s", utc=True).tz_convert(tz).normalize(),
+        dtype="float64",
+    )
+    frame["Dividends"] = amounts.groupby(level=0).sum().reindex(frame.index).fillna(0.0)
+    frame = frame[~frame.index.duplicated(keep="last")]
+    return frame.dropna(subset=["Close"])
+
+
+class AsyncQuoteFetcher:
+    def __init__(self, bucket, max_in_flight=200, timeout=10.0, max_retries=4):
+        self.bucket = bucket
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._metrics = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "completed": 0,
+            "failed": 0,
+            "rate_limited": 0,
+            "in_flight": 0,
+            "waiting_for_token": 0,
+        }
+
+    def _ensure_loop(self):
+        # The loop thread does not survive fork, so every worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            import httpx
+
+            self._loop = asyncio.new_event_loop()
+            # (symbol, period, interval) -> Future of the fetch in flight
+            self._inflight = {}
+            self._inflight_lock = threading.Lock()
+            started = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(self._loop)
+                self._slots = asyncio.Semaphore(self.max_in_flight)
+                self._client = httpx.AsyncClient(
+                    headers={"User-Agent": USER_AGENT},
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=self.max_in_flight,
+                                        max_keepalive_connections=self.max_in_flight),
+                )
+                started.set()
+                self._loop.run_forever()
+
+            threading.Thread(target=run, name="async-fetcher", daemon=True).start()
+            started.wait()
+            self._pid = os.getpid()
+
+    async def _acquire_token(self, priority):
+        self._metrics["waiting_for_token"] += 1
+        try:
+            await asyncio.wrap_future(self.bucket.request(priority))
+        finally:
+            self._metrics["waiting_for_token"] -= 1
+
+    async def _fetch_history(self, symbol, period, interval, priority):
+        params = {"interval": interval, "events": "div", "includePrePost": "false"}
+        if period == "max":
+            params.update(period1=MAX_PERIOD_START, period2=int(time.time()))
+        else:
+            params["range"] = period
+
+        self._metrics["submitted"] += 1
+        async with self._slots:
+            self._metrics["in_flight"] += 1
+            try:
+                attempt = 0
+                while True:
+                    await self._acquire_token(priority)
+                    response = await self._client.get(CHART_URL.format(symbol=symbol), params=params)
+                    if response.status_code != 429:
+                        break
+                    self._metrics["rate_limited"] += 1
+                    if attempt >= self.max_retries:
+                        raise RateLimitedError(f"Upstream rate limit for {symbol}")
+                    delay = backoff_delay(attempt)
+                    self.bucket.pause(delay)
+                    await asyncio.sleep(delay)
+                    attempt += 1
+
+                # Unknown symbols answer 404 with an error body; treat as empty history
+                if response.status_code != 404:
+                    response.raise_for_status()
+                frame = chart_frame(response.json(), intraday=interval != "1d")
+                self._metrics["completed"] += 1
+                return frame
+            except Exception:
+                self._metrics["failed"] += 1
+                raise
+            finally:
+                self._metrics["in_flight"] -= 1
+
+    def submit_history(self, symbol, period="1d", priority=Priority.QUOTE, interval="1d"):
+        """
+        Start fetching `interval` bars ("1d", or intraday like "1m", "5m") for
+        `period` ("1d", "5d", ..., "max"); returns a Future. A request for bars
+        already in flight gets that fetch's Future.
+        """
+        self._ensure_loop()
+        key = (symbol.upper(), period, interval)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._metrics["deduplicated"] += 1
+                return future
+            future = asyncio.run_coroutine_threadsafe(self._fetch_history(*key, priority), self._loop)
+            self._inflight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._inflight_lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self):
+        return {**self._metrics, "max_in_flight": self.max_in_flight}
@@ -0,0 +1,76 @@
+import click
+
+from . import db
+from .config import Config
+from .startup import profile_imports
+
+
+def register_commands(app):
+    @app.cli.command("init-schema")
+    def init_schema():
+        """Create any missing database tables."""
+        from . import models  # Import models so they are registered with SQLAlchemy
+        db.create_all()
+        click.echo("Database schema created.")
+
+    @app.cli.command("upgrade-schema")
+    @click.option("--dry-run", is_flag=True, help="Print the ALTER TABLE statements without running them.")
+    def upgrade_schema_command(dry_run):
+        """Alter existing numeric columns whose type no longer matches the models."""
+        from .schema import upgrade_schema
+        statements = upgrade_schema(dry_run=dry_run)
+        if not statements:
+            click.echo("Schema is up to date.")
+        for statement in statements:
+            click.echo(f"{statement};")
+        if statements and not dry_run:
+            click.echo(f"Applied {len(statements)} column changes.")
+
+    @app.cli.command("startup-profile")
+    @click.option("--mode", type=click.Choice(["lazy", "preload"]), default="preload",
+                  help="Startup mode to profile.")
+    @click.option("--limit", default=20, show_default=True, help="Number of modules to show.")
+    def startup_profile(mode, limit):
+        """Report import cost per top-level module during app startup."""
+        click.echo(f"{'module':<30} {'cumulative ms':>14}")
+        for module, ms in profile_imports(mode=mode, limit=limit):
+            click.echo(f"{module:<30} {ms:>14.1f}")
+
+    @app.cli.command("refresh-fundamentals")
+    @click.option("--max-age", type=int, default=None,
+                  help="Only refresh rows older than this many seconds "
+                       "(default: FUNDAMENTALS_REFRESH_SECONDS, or one day when that is 0).")
+    @click.option("--rate", type=float, default=None,
+                  help="Upstream requests per second for this run (default: FUNDAMENTALS_REFRESH_RATE).")
+    def refresh_fundamentals_command(max_age, rate):
+        """Re-fetch screener fundamentals for the symbols in tickers.json."""
+        from .api.quote import upstream
+        from .fundamentals import refresh_fundamentals
+        # This process has its own token bucket, on top of the web workers' budget
+        upstream.bucket.rate = Config.FUNDAMENTALS_REFRESH_RATE if rate is None else rate
+        refreshed, failed = refresh_fundamentals(max_age=max_age)
+        click.echo(f"Refreshed {refreshed} symbols, {failed} failed.")
+
+    @app.cli.command("rebuild-holdings")
+    @click.option("--repair", is_flag=True, help="Rewrite holdings that disagree with the ledger.")
+    @click.option("--portfolio-id", type=int, default=None, help="Only check one portfolio.")
+    @click.option("--batch-size", default=5000, show_default=True, help="Portfolio ids per batch.")
+    def rebuild_holdings_command(repair, portfolio_id, batch_size):
+        """Recompute holdings from the transaction ledger and report mismatches."""
+        from .holdings_rebuild import rebuild_holdings
+        from .schema import pending_column_changes
+        if repair and pending_column_changes():
+            # Old DECIMAL(10,0) columns would round the repaired values on write
+            raise click.ClickException("Column types are out of date; run `flask --app app upgrade-schema` first.")
+        report = rebuild_holdings(repair=repair, portfolio_id=portfolio_id, batch_size=batch_size)
+
+        click.echo(f"Scanned {report['transactions_scanned']} transactions, "
+                   f"{report['positions_checked']} positions")
+        for status, count in sorted(report["counts"].items()):
+            click.echo(f"  {status:<20} {count:>10}")
+        for detail in report["details"]:
+            click.echo(f"  portfolio {detail['portfolio_id']} {detail['symbol']}: {detail['status']} "
+                       f"qty {detail['actual_qty']} -> {detail['expected_qty']}, "
+                       f"avg {detail['actual_avg_price']} -> {detail['expected_avg_price']}")
+        if repair:
+            click.echo("Holdings repaired (oversold positions left untouched).")
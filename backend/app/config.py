@@ -15,3 +15,45 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f'mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}'
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Startup behaviour:
+    #   "lazy"    - defer yfinance/pandas imports and the ticker list until first use
+    #   "preload" - load them once in create_app (e.g. in a gunicorn --preload master)
+    #               so forked workers share them copy-on-write
+    STARTUP_MODE = os.getenv('STARTUP_MODE', 'lazy')
+
+    # Schema creation runs via `flask --app app init-schema` unless explicitly enabled here
+    AUTO_CREATE_SCHEMA = os.getenv('AUTO_CREATE_SCHEMA', 'false').lower() == 'true'
+
+    # Upstream (Yahoo Finance) budget shared by all requests in this process. Every process
+    # (each gunicorn worker, the refresh-fundamentals cron job) has its own budget, so the
+    # total upstream rate is the sum over processes.
+    UPSTREAM_RATE = float(os.getenv('UPSTREAM_RATE', '2'))  # requests per second
+    UPSTREAM_BURST = int(os.getenv('UPSTREAM_BURST', '5'))
+    UPSTREAM_WORKERS = int(os.getenv('UPSTREAM_WORKERS', '4'))
+    UPSTREAM_MAX_RETRIES = int(os.getenv('UPSTREAM_MAX_RETRIES', '4'))
+    # How long a request waits for its upstream call before falling back to stale data
+    UPSTREAM_WAIT_TIMEOUT = float(os.getenv('UPSTREAM_WAIT_TIMEOUT', '15'))
+
+    # Response encoding: "orjson" (falls back to "json" when orjson is not installed)
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'orjson')
+    # gzip JSON responses at least this many bytes long
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))
+
+    # Screener fundamentals: snapshot location and how often each worker re-fetches rows in a
+    # background thread. 0 (default) leaves refreshing to `flask --app app refresh-fundamentals`
+    # from cron; workers reload the snapshot whenever it changes.
+    FUNDAMENTALS_PATH = os.getenv(
+        'FUNDAMENTALS_PATH',
+        os.path.join(os.path.dirname(__file__), 'data', 'fundamentals.json')
+    )
+    FUNDAMENTALS_REFRESH_SECONDS = int(os.getenv('FUNDAMENTALS_REFRESH_SECONDS', '0'))
+    # Upstream requests per second for the refresh-fundamentals command, on top of the workers' rate
+    FUNDAMENTALS_REFRESH_RATE = float(os.getenv('FUNDAMENTALS_REFRESH_RATE', '0.5'))
+
+    # Async price/history fetcher: concurrent upstream requests per worker process
+    ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', '200'))
+    ASYNC_HTTP_TIMEOUT = float(os.getenv('ASYNC_HTTP_TIMEOUT', '10'))
+    # How long price lookups (portfolio, trade validation) wait before using stale data
+    PRICE_WAIT_TIMEOUT = float(os.getenv('PRICE_WAIT_TIMEOUT', '5'))
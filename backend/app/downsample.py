@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def lttb(x, y, points):
+    """
+    Largest-Triangle-Three-Buckets: return the indices of `points` samples that
+    best preserve the visual shape of the (x, y) series.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into points - 2 buckets
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # The bucket after the last one is the final point itself
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        bx, by = x[start:end], y[start:end]
+        # Twice the triangle area between the previous pick, each candidate and the next bucket's mean
+        area = np.abs((x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(y, points):
+    """Keep the minimum and maximum of each of points / 2 equal-width buckets."""
+    n = len(y)
+    if points >= n or points < 2:
+        return np.arange(n)
+
+    n_buckets = points // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    # Gather buckets into a rectangular matrix; short buckets repeat their last index
+    width = int(np.diff(edges).max())
+    matrix = np.minimum(edges[:-1, None] + np.arange(width), edges[1:, None] - 1)
+    values = y[matrix]
+    rows = np.arange(n_buckets)
+    lows = matrix[rows, values.argmin(axis=1)]
+    highs = matrix[rows, values.argmax(axis=1)]
+    return np.unique(np.concatenate((lows, highs)))
+
+
+METHODS = ("lttb", "minmax")
+
+
+def downsample(x, y, points, method="lttb"):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if method == "minmax":
+        return minmax(y, points)
+    return lttb(x, y, points)
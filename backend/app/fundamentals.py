@@ -0,0 +1,234 @@
+"""
+Columnar fundamentals table for the stock screener.
+
+One row per symbol in tickers.json, with each field stored as a NumPy array
+so filters and sorts over the whole universe are single vectorised passes.
+Rows are filled from any `info` dict we fetch anyway (quote page views) and by
+a background refresher that goes through the upstream scheduler at the lowest
+priority. The table is persisted as a JSON snapshot so a restart does not need
+thousands of upstream calls.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from app.api.symbol_search import get_local_tickers
+from app.config import Config
+from app.startup import load_once
+from app.upstream import Priority
+
+# Row age that counts as stale when no refresh interval is configured
+DEFAULT_MAX_AGE = 86400
+
+# column name -> key in the yfinance info dict
+NUMERIC_FIELDS = {
+    "market_cap": "marketCap",
+    "pe_ratio": "trailingPE",
+    "price": "currentPrice",
+    "dividend_yield": "dividendYield",
+    "fifty_two_week_low": "fiftyTwoWeekLow",
+    "fifty_two_week_high": "fiftyTwoWeekHigh",
+}
+TEXT_FIELDS = {
+    "name": "longName",
+    "sector": "sector",
+}
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class FundamentalsTable:
+    def __init__(self, symbols, names):
+        self.lock = threading.Lock()
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+        n = len(symbols)
+        self.columns = {
+            "symbol": np.array(symbols, dtype=object),
+            "name": np.array(names, dtype=object),
+            "sector": np.full(n, None, dtype=object),
+            "updated_at": np.zeros(n),
+        }
+        for field in NUMERIC_FIELDS:
+            self.columns[field] = np.full(n, np.nan)
+        # Lower-cased copy so sector filters are a plain np.isin
+        self.sector_key = np.full(n, "", dtype=object)
+        self.snapshot_mtime = None
+
+    def update_from_info(self, symbol, info, updated_at=None):
+        i = self.index.get(symbol.upper())
+        if i is None or not info:
+            return
+        with self.lock:
+            for field, key in NUMERIC_FIELDS.items():
+                self.columns[field][i] = _as_float(info.get(key))
+            for field, key in TEXT_FIELDS.items():
+                if info.get(key):
+                    self.columns[field][i] = info[key]
+            self.sector_key[i] = (self.columns["sector"][i] or "").lower()
+            self.columns["updated_at"][i] = updated_at or time.time()
+
+    def stale_symbols(self, max_age):
+        with self.lock:
+            mask = self.columns["updated_at"] < time.time() - max_age
+            return self.columns["symbol"][mask].tolist()
+
+    def screen(self, sectors=None, ranges=None, sort="market_cap", descending=True,
+               offset=0, limit=50):
+        """
+        Filter with `sectors` (lower-cased names) and `ranges` ({column: (low, high)},
+        either bound may be None), sort and page. Returns (total, {column: array}).
+        Rows missing a numeric value never match a range on it and sort last.
+        """
+        with self.lock:
+            mask = np.ones(len(self.index), dtype=bool)
+            if sectors:
+                mask &= np.isin(self.sector_key, list(sectors))
+            for field, (low, high) in (ranges or {}).items():
+                values = self.columns[field]
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+
+            rows = np.flatnonzero(mask)
+            values = self.columns[sort][rows]
+            if values.dtype == object:
+                order = np.argsort(np.array([v.lower() for v in values], dtype=object), kind="stable")
+                if descending:
+                    order = order[::-1]
+            else:
+                # NaN sorts last either way
+                order = np.argsort(-values if descending else values, kind="stable")
+
+            page = rows[order[offset:offset + limit]]
+            return len(rows), {field: column[page] for field, column in self.columns.items()}
+
+    def save(self, path):
+        with self.lock:
+            snapshot = {
+                field: [None if isinstance(v, float) and np.isnan(v) else v for v in column.tolist()]
+                for field, column in self.columns.items()
+            }
+        # A private temp file per writer, so concurrent saves never interleave
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, path)
+            self.snapshot_mtime = os.stat(path).st_mtime_ns
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load(self, path):
+        """Merge a snapshot, taking only rows newer than what is already in memory."""
+        if not os.path.exists(path):
+            return
+        mtime = os.stat(path).st_mtime_ns
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+
+        with self.lock:
+            for row, symbol in enumerate(snapshot.get("symbol", [])):
+                i = self.index.get(symbol)
+                if i is None:
+                    continue  # dropped from tickers.json since the snapshot
+                if (snapshot["updated_at"][row] or 0) <= self.columns["updated_at"][i]:
+                    continue
+                # None becomes NaN in the float columns
+                for field in ("sector", "updated_at", *NUMERIC_FIELDS):
+                    self.columns[field][i] = snapshot[field][row]
+                if snapshot["name"][row]:
+                    self.columns["name"][i] = snapshot["name"][row]
+                self.sector_key[i] = (self.columns["sector"][i] or "").lower()
+            self.snapshot_mtime = mtime
+
+    def reload_if_changed(self, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self.snapshot_mtime:
+            self.load(path)
+
+
+def _build_table():
+    tickers = get_local_tickers()
+    table = FundamentalsTable([t["ticker"] for t in tickers], [t["name"] for t in tickers])
+    table.load(Config.FUNDAMENTALS_PATH)
+    return table
+
+
+def get_fundamentals():
+    table = load_once("fundamentals", _build_table)
+    # Pick up snapshots saved by `refresh-fundamentals` or another worker
+    table.reload_if_changed(Config.FUNDAMENTALS_PATH)
+    return table
+
+
+def _fetch_info(symbol):
+    from app.startup import get_yfinance
+    return get_yfinance().Ticker(symbol).info or {}
+
+
+def refresh_fundamentals(max_age=None, chunk_size=200, timeout=None):
+    """
+    Re-fetch rows older than `max_age` seconds through the upstream scheduler at
+    background priority, so interactive requests always go first.
+    Returns (refreshed, failed).
+    """
+    from app.api.quote import upstream
+
+    table = get_fundamentals()
+    if max_age is None:
+        max_age = Config.FUNDAMENTALS_REFRESH_SECONDS or DEFAULT_MAX_AGE
+    symbols = table.stale_symbols(max_age)
+    refreshed = failed = 0
+
+    # Submit in chunks so the queue never holds the whole universe at once
+    for start in range(0, len(symbols), chunk_size):
+        chunk = symbols[start:start + chunk_size]
+        futures = {
+            symbol: upstream.submit(("info", symbol), lambda s=symbol: _fetch_info(s), Priority.BACKGROUND)
+            for symbol in chunk
+        }
+        for symbol, future in futures.items():
+            try:
+                table.update_from_info(symbol, future.result(timeout=timeout))
+                refreshed += 1
+            except Exception as e:
+                print(f"Error refreshing fundamentals for {symbol}: {e}")
+                failed += 1
+        table.save(Config.FUNDAMENTALS_PATH)
+
+    return refreshed, failed
+
+
+_refresher = {"pid": None}
+
+
+def start_refresher():
+    """Start the periodic refresh thread once per process (after any fork)."""
+    interval = Config.FUNDAMENTALS_REFRESH_SECONDS
+    if interval <= 0 or _refresher["pid"] == os.getpid():
+        return
+    _refresher["pid"] = os.getpid()
+
+    def loop():
+        while True:
+            try:
+                refresh_fundamentals(max_age=interval)
+            except Exception as e:
+                print(f"Fundamentals refresh failed: {e}")
+            time.sleep(min(interval, 3600))
+
+    threading.Thread(target=loop, name="fundamentals-refresh", daemon=True).start()
@@ -0,0 +1,235 @@
+"""
+Recompute holdings from the transaction ledger.
+
+For every (portfolio_id, product_symbol) the ledger is replayed with the same
+rules as TransactionResource: a buy moves the average price to the
+quantity-weighted mean, a sell only reduces quantity, and a position that
+reaches zero starts over. The replay is vectorised over whole batches of
+portfolios instead of walking rows through the ORM.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, insert, text, update
+
+from app import db
+from app.models import Holding, ProductType, Transaction
+
+# Quantities are compared as integers in units of the column scale
+QTY_SCALE = 10 ** Holding.qty.type.scale
+PRICE_TOLERANCE = 10 ** -Holding.avg_price.type.scale
+DETAIL_LIMIT = 100
+
+
+def _load_transactions(lo, hi):
+    query = text(
+        f"SELECT portfolio_id, product_symbol, type, qty, price, product_type "
+        f"FROM {Transaction.__tablename__} "
+        f"WHERE portfolio_id >= :lo AND portfolio_id < :hi "
+        f"ORDER BY portfolio_id, product_symbol, transaction_date, id"
+    )
+    return pd.read_sql(query, db.engine, params={"lo": lo, "hi": hi})
+
+
+def _load_holdings(lo, hi):
+    query = text(
+        f"SELECT id, portfolio_id, product_symbol, qty, avg_price "
+        f"FROM {Holding.__tablename__} "
+        f"WHERE portfolio_id >= :lo AND portfolio_id < :hi "
+        f"ORDER BY id"
+    )
+    return pd.read_sql(query, db.engine, params={"lo": lo, "hi": hi})
+
+
+def replay_ledger(tx):
+    """
+    Collapse a sorted transaction frame into one row per position with columns
+    portfolio_id, product_symbol, product_type, qty_units, avg_price, oversold.
+
+    With Q the running quantity, each buy sets avg = w * avg + (1 - w) * price
+    where w = Q_before / Q_after. Unrolled, the final average is
+    sum(price_j * (1 - w_j) * prod(w_{j+1..end})), and the products are
+    computed as exp of differences of a segmented cumulative log sum.
+    Every factor is <= 1, so this never overflows.
+    """
+    n = len(tx)
+    if n == 0:
+        return pd.DataFrame(columns=["portfolio_id", "product_symbol", "product_type",
+                                     "qty_units", "avg_price", "oversold"])
+
+    pid = tx["portfolio_id"].to_numpy()
+    sym = tx["product_symbol"].to_numpy()
+    is_buy = (tx["type"] == "BUY").to_numpy()
+    qty = np.rint(tx["qty"].to_numpy(dtype=np.float64) * QTY_SCALE).astype(np.int64)
+    price = tx["price"].to_numpy(dtype=np.float64)
+
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = (pid[1:] != pid[:-1]) | (sym[1:] != sym[:-1])
+    group_id = np.cumsum(new_group) - 1
+    group_last = np.r_[np.flatnonzero(new_group)[1:], n] - 1
+
+    # Running quantity per group
+    signed = np.where(is_buy, qty, -qty)
+    running = np.cumsum(signed)
+    offset = (running - signed)[new_group]
+    q_after = running - offset[group_id]
+    q_before = q_after - signed
+    oversold = np.bincount(group_id, weights=(q_after < 0)) > 0
+
+    # A buy into an empty position starts a new averaging segment
+    seg_start = new_group | (q_before == 0)
+    seg_id = np.cumsum(seg_start) - 1
+
+    w = np.ones(n)
+    buys = is_buy & (q_after > 0)
+    w[buys] = q_before[buys] / q_after[buys]
+    log_w = np.zeros(n)
+    keep = buys & ~seg_start & (q_before > 0)
+    log_w[keep] = np.log(w[keep])
+
+    cum_log = np.cumsum(log_w)
+    cum_log -= cum_log[seg_start][seg_id]
+    seg_last = np.r_[np.flatnonzero(seg_start)[1:], n] - 1
+    decay = np.exp(cum_log[seg_last][seg_id] - cum_log)
+    contribution = np.where(is_buy, price * (1 - w), 0.0) * decay
+    seg_avg = np.bincount(seg_id, weights=contribution)
+
+    return pd.DataFrame({
+        "portfolio_id": pid[group_last],
+        "product_symbol": sym[group_last],
+        "product_type": tx["product_type"].to_numpy()[group_last],
+        "qty_units": q_after[group_last],
+        "avg_price": seg_avg[seg_id[group_last]],
+        "oversold": oversold,
+    })
+
+
+def _compare(expected, holdings):
+    """Classify every position as ok, missing, orphaned, mismatched, duplicate or oversold."""
+    holdings = holdings.copy()
+    holdings["qty_units"] = np.rint(holdings["qty"].to_numpy(dtype=np.float64) * QTY_SCALE).astype(np.int64)
+    holdings["avg_price"] = holdings["avg_price"].to_numpy(dtype=np.float64)
+
+    # Without a unique constraint a position can have several rows; keep the oldest
+    dup_mask = holdings.duplicated(["portfolio_id", "product_symbol"], keep="first")
+    duplicates = holdings[dup_mask]
+    holdings = holdings[~dup_mask]
+
+    expected = expected[expected["oversold"] | (expected["qty_units"] > 0)]
+    merged = expected.merge(
+        holdings, on=["portfolio_id", "product_symbol"], how="outer",
+        suffixes=("_expected", "_actual"), indicator=True,
+    )
+
+    status = np.full(len(merged), "ok", dtype=object)
+    both = (merged["_merge"] == "both").to_numpy()
+    qty_diff = both & (merged["qty_units_expected"] != merged["qty_units_actual"]).to_numpy()
+    price_diff = both & (
+        np.abs(merged["avg_price_expected"] - merged["avg_price_actual"]) > PRICE_TOLERANCE
+    ).to_numpy()
+    status[price_diff] = "avg_price_mismatch"
+    status[qty_diff] = "qty_mismatch"
+    status[(merged["_merge"] == "left_only").to_numpy()] = "missing"
+    status[(merged["_merge"] == "right_only").to_numpy()] = "orphaned"
+    status[merged["oversold"].fillna(False).to_numpy(dtype=bool)] = "oversold"
+    merged["status"] = status
+    return merged, duplicates
+
+
+def _to_decimal(value, scale):
+    return Decimal(f"{value:.{scale}f}")
+
+
+def _repair(merged, duplicates):
+    now = datetime.now(timezone.utc)
+    qty_scale = Holding.qty.type.scale
+    price_scale = Holding.avg_price.type.scale
+
+    changed = merged[merged["status"].isin(["qty_mismatch", "avg_price_mismatch"])]
+    missing = merged[merged["status"] == "missing"]
+    orphaned = merged[merged["status"] == "orphaned"]
+
+    if len(changed):
+        db.session.execute(update(Holding), [
+            {
+                "id": int(row.id),
+                "qty": _to_decimal(row.qty_units_expected / QTY_SCALE, qty_scale),
+                "avg_price": _to_decimal(row.avg_price_expected, price_scale),
+                "last_updated": now,
+            }
+            for row in changed.itertuples(index=False)
+        ])
+    if len(missing):
+        db.session.execute(insert(Holding), [
+            {
+                "portfolio_id": int(row.portfolio_id),
+                "product_symbol": row.product_symbol,
+                "qty": _to_decimal(row.qty_units_expected / QTY_SCALE, qty_scale),
+                "avg_price": _to_decimal(row.avg_price_expected, price_scale),
+                "product_type": ProductType(row.product_type),
+                "last_updated": now,
+            }
+            for row in missing.itertuples(index=False)
+        ])
+    stale_ids = [int(i) for i in orphaned["id"]] + [int(i) for i in duplicates["id"]]
+    if stale_ids:
+        db.session.execute(delete(Holding).where(Holding.id.in_(stale_ids)))
+    db.session.commit()
+
+
+def rebuild_holdings(repair=False, portfolio_id=None, batch_size=5000):
+    """
+    Replay the ledger and compare against the holdings table, one batch of
+    portfolio ids at a time. With repair=True, mismatched, missing, orphaned
+    and duplicate rows are fixed. Positions whose ledger sells more than it
+    owns are only reported.
+    """
+    if portfolio_id is not None:
+        lo, hi = portfolio_id, portfolio_id
+    else:
+        bounds = db.session.execute(text(
+            f"SELECT MIN(p), MAX(p) FROM ("
+            f"SELECT MIN(portfolio_id) AS p FROM {Transaction.__tablename__} UNION ALL "
+            f"SELECT MAX(portfolio_id) FROM {Transaction.__tablename__} UNION ALL "
+            f"SELECT MIN(portfolio_id) FROM {Holding.__tablename__} UNION ALL "
+            f"SELECT MAX(portfolio_id) FROM {Holding.__tablename__}) AS b"
+        )).one()
+        lo, hi = bounds
+        db.session.rollback()  # release the read snapshot before long batches
+
+    report = {"transactions_scanned": 0, "positions_checked": 0, "counts": {}, "details": [], "repaired": repair}
+    if lo is None:
+        return report
+
+    for start in range(lo, hi + 1, batch_size):
+        end = min(start + batch_size, hi + 1)
+        tx = _load_transactions(start, end)
+        expected = replay_ledger(tx)
+        merged, duplicates = _compare(expected, _load_holdings(start, end))
+
+        report["transactions_scanned"] += len(tx)
+        report["positions_checked"] += len(merged)
+        for status, count in merged["status"].value_counts().items():
+            report["counts"][status] = report["counts"].get(status, 0) + int(count)
+        if len(duplicates):
+            report["counts"]["duplicate"] = report["counts"].get("duplicate", 0) + len(duplicates)
+
+        bad = merged[merged["status"] != "ok"]
+        room = DETAIL_LIMIT - len(report["details"])
+        for row in bad.head(max(room, 0)).itertuples(index=False):
+            report["details"].append({
+                "portfolio_id": int(row.portfolio_id),
+                "symbol": row.product_symbol,
+                "status": row.status,
+                "expected_qty": None if pd.isna(row.qty_units_expected) else row.qty_units_expected / QTY_SCALE,
+                "actual_qty": None if pd.isna(row.qty_units_actual) else row.qty_units_actual / QTY_SCALE,
+                "expected_avg_price": None if pd.isna(row.avg_price_expected) else round(row.avg_price_expected, 6),
+                "actual_avg_price": None if pd.isna(row.avg_price_actual) else round(row.avg_price_actual, 6),
+            })
+
+        if repair:
+            _repair(merged[merged["status"] != "oversold"], duplicates)
+
+    return report
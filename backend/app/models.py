@@ -22,7 +22,7 @@ class User(db.Model):
         return {
             'id': self.id,
             'name': self.name,
-            'balance': float(self.balance) if self.balance else 0
+            'balance': self.balance
         }
 
 class Portfolio(db.Model):
@@ -39,7 +39,7 @@ class Portfolio(db.Model):
             'id': self.id,
             'user_id': self.user_id,
             'name': self.name,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
 
 class Transaction(db.Model):
@@ -47,24 +47,24 @@ class Transaction(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     portfolio_id = db.Column(db.Integer, db.ForeignKey('portfolios.id'), nullable=False)
     product_symbol = db.Column(db.String(255), nullable=False)
-    qty = db.Column(db.Numeric, nullable=False)
-    price = db.Column(db.Numeric, nullable=False)
+    qty = db.Column(db.Numeric(20, 6), nullable=False)
+    price = db.Column(db.Numeric(20, 6), nullable=False)
     product_type = db.Column(db.Enum(ProductType), nullable=False)
     type = db.Column(db.Enum(TransactionType), nullable=False)
     transaction_date = db.Column(db.Date, nullable=False)
-    fee = db.Column(db.Numeric, nullable=False)
+    fee = db.Column(db.Numeric(20, 6), nullable=False)
 
     def to_dict(self):
         return {
             'id': self.id,
             'portfolio_id': self.portfolio_id,
             'product_symbol': self.product_symbol,
-            'qty': float(self.qty) if self.qty else 0,
-            'price': float(self.price) if self.price else 0,
+            'qty': self.qty,
+            'price': self.price,
             'product_type': self.product_type.value,
             'type': self.type.value,
-            'transaction_date': self.transaction_date.isoformat(),
-            'fee': float(self.fee) if self.fee else 0
+            'transaction_date': self.transaction_date,
+            'fee': self.fee
         }
 
 class Holding(db.Model):
@@ -72,8 +72,8 @@ class Holding(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     portfolio_id = db.Column(db.Integer, db.ForeignKey('portfolios.id'), nullable=False)
     product_symbol = db.Column(db.String(255), nullable=False)
-    qty = db.Column(db.Numeric, nullable=False)
-    avg_price = db.Column(db.Numeric, nullable=False)
+    qty = db.Column(db.Numeric(20, 6), nullable=False)
+    avg_price = db.Column(db.Numeric(20, 6), nullable=False)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     product_type = db.Column(db.Enum(ProductType), nullable=False)
 
@@ -82,8 +82,8 @@ class Holding(db.Model):
             'id': self.id,
             'portfolio_id': self.portfolio_id,
             'symbol': self.product_symbol,
-            'shares': float(self.qty) if self.qty else 0,
-            'avg_price': float(self.avg_price) if self.avg_price else 0,
-            'last_updated': self.last_updated.isoformat(),
+            'shares': self.qty,
+            'avg_price': self.avg_price,
+            'last_updated': self.last_updated,
             'product_type': self.product_type.value
         }
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+In-place column upgrades for existing databases.
+
+db.create_all() only creates missing tables, so column type changes in
+app.models (e.g. quantities and prices moving to DECIMAL(20, 6)) never reach
+tables that already exist. This compares the numeric columns of every model
+table with the live schema and alters the ones whose precision or scale
+differ.
+"""
+from sqlalchemy import Numeric, inspect, text
+
+from app import db
+
+# dialect -> ALTER TABLE template
+ALTER_COLUMN = {
+    "mysql": "ALTER TABLE {table} MODIFY COLUMN {column} {type}{null}",
+    "mariadb": "ALTER TABLE {table} MODIFY COLUMN {column} {type}{null}",
+    "postgresql": "ALTER TABLE {table} ALTER COLUMN {column} TYPE {type}",
+}
+
+
+def pending_column_changes():
+    """ALTER TABLE statements needed to bring numeric columns in line with the models."""
+    from app import models  # register the tables with SQLAlchemy
+
+    dialect = db.engine.dialect
+    template = ALTER_COLUMN.get(dialect.name)
+    if template is None:
+        return []  # e.g. SQLite, whose NUMERIC columns have no fixed scale
+
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    statements = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue  # init-schema creates it with the right types
+        live = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            wanted = column.type
+            current = live.get(column.name)
+            if not isinstance(wanted, Numeric) or wanted.scale is None or current is None:
+                continue
+            if (getattr(current, "precision", None), getattr(current, "scale", None)) == (wanted.precision, wanted.scale):
+                continue
+            statements.append(template.format(
+                table=dialect.identifier_preparer.quote(table.name),
+                column=dialect.identifier_preparer.quote(column.name),
+                type=wanted.compile(dialect=dialect),
+                null="" if column.nullable else " NOT NULL",
+            ))
+    return statements
+
+
+def upgrade_schema(dry_run=False):
+    """Run (or with dry_run, only return) the pending ALTER TABLE statements."""
+    statements = pending_column_changes()
+    if statements and not dry_run:
+        with db.engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+    return statements
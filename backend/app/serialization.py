@@ -0,0 +1,82 @@
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+from flask import make_response, request
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    # numpy arrays and scalars, without importing numpy here
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data, backend="orjson"):
+    if backend == "orjson" and orjson is not None:
+        return orjson.dumps(data, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def columnar(rows, fields=()):
+    """
+    Turn a list of dicts into a dict of lists, e.g. {"symbol": [...], "shares": [...]}.
+    `fields` come first and are present even when `rows` is empty; any other
+    keys follow in order of first appearance (rows may carry optional fields).
+    """
+    keys = dict.fromkeys(fields)
+    keys.update(dict.fromkeys(key for row in rows for key in row))
+    return {key: [row.get(key) for row in rows] for key in keys}
+
+
+def wants_columns():
+    return request.args.get("shape") == "columns"
+
+
+def init_app(app, api):
+    backend = app.config["JSON_BACKEND"]
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+    level = app.config["COMPRESS_LEVEL"]
+
+    @api.representation("application/json")
+    def output_json(data, code, headers=None):
+        response = make_response(dumps(data, backend), code)
+        response.headers.extend(headers or {})
+        response.mimetype = "application/json"
+        return response
+
+    @app.after_request
+    def finalize_response(response):
+        if response.mimetype != "application/json" or response.direct_passthrough:
+            return response
+
+        # Weak ETag: the same tag stays valid for the gzip and identity encodings
+        if request.method in ("GET", "HEAD") and response.status_code == 200:
+            response.add_etag(weak=True)
+            response.make_conditional(request)
+
+        if (
+            response.status_code == 200
+            and "gzip" in request.headers.get("Accept-Encoding", "")
+            and "Content-Encoding" not in response.headers
+            and response.content_length is not None
+            and response.content_length >= min_size
+        ):
+            response.set_data(gzip.compress(response.get_data(), compresslevel=level))
+            response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+        return response
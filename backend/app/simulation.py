@@ -0,0 +1,127 @@
+"""
+In-memory what-if engine for portfolios: apply hypothetical trades or a target
+allocation to the current positions and compare risk before and after. Nothing
+here touches the database.
+"""
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+def orders_for_targets(qty, prices, cash, weights, fractional=False):
+    """
+    Signed share deltas that move each position to `weights` of the total
+    account value (positions + cash). Without `fractional`, deltas are rounded
+    down to whole shares (buy a little less, sell a little more), so no position
+    ends above its target and the buys are always funded.
+    """
+    total = qty @ prices + cash
+    delta = weights * total / prices - qty
+    # The epsilon keeps float noise (e.g. -1e-15 on an exact target) from costing a share
+    return delta if fractional else np.floor(delta + 1e-9)
+
+
+def apply_orders(qty, prices, cash, delta):
+    new_qty = qty + delta
+    new_cash = cash - delta @ prices
+    return new_qty, new_cash
+
+
+def risk_metrics(closes, weight_sets, values):
+    """
+    Historical risk for each row of `weight_sets` (fractions of account value;
+    the remainder is cash with zero return). `closes` is a date x symbol frame
+    with the same column order as the weights.
+    """
+    returns = closes.pct_change().iloc[1:].to_numpy()
+    if len(returns) < 2:
+        return [None] * len(weight_sets)
+
+    # (days x symbols) @ (symbols x scenarios) -> one daily return series per scenario
+    daily = returns @ weight_sets.T
+    growth = np.cumprod(1 + daily, axis=0)
+    drawdown = 1 - growth / np.maximum.accumulate(growth, axis=0)
+    vol = daily.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+    ann_return = daily.mean(axis=0) * TRADING_DAYS
+    var_95 = -np.percentile(daily, 5, axis=0)
+
+    return [
+        {
+            "annual_volatility": round(float(vol[i]), 4),
+            "annual_return": round(float(ann_return[i]), 4),
+            "sharpe_ratio": round(float(ann_return[i] / vol[i]), 2) if vol[i] > 0 else None,
+            "max_drawdown": round(float(drawdown[:, i].max()), 4),
+            "value_at_risk_95": round(float(var_95[i] * values[i]), 2),
+            "days": len(daily),
+        }
+        for i in range(len(weight_sets))
+    ]
+
+
+def align_closes(histories, lookback):
+    """Join each symbol's close series on common dates and keep the last `lookback` + 1 rows."""
+    closes = pd.concat({symbol: series for symbol, series in histories.items()}, axis=1)
+    return closes.dropna().tail(lookback + 1)
+
+
+def simulate(symbols, qty, prices, cash, histories, delta, lookback=TRADING_DAYS):
+    """
+    Apply `delta` share changes and describe the account before and after.
+    `histories` maps symbol -> close price Series for the risk metrics.
+    """
+    new_qty, new_cash = apply_orders(qty, prices, cash, delta)
+    before_values = qty * prices
+    after_values = new_qty * prices
+    totals = np.array([before_values.sum() + cash, after_values.sum() + new_cash])
+    weights = np.vstack([before_values, after_values]) / totals[:, None]
+
+    violations = []
+    for i in np.flatnonzero(new_qty < -1e-9):
+        violations.append(f"Not enough shares of {symbols[i]} to sell")
+    if new_cash < -1e-9:
+        violations.append("Insufficient balance")
+
+    with_history = [i for i, symbol in enumerate(symbols) if histories.get(symbol) is not None]
+    risk = [None, None]
+    if with_history:
+        closes = align_closes({symbols[i]: histories[symbols[i]] for i in with_history}, lookback)
+        risk = risk_metrics(closes, weights[:, with_history], totals)
+
+    def describe(position_qty, values, cash_left, total, w, metrics):
+        held = np.flatnonzero(np.abs(position_qty) > 1e-9)
+        return {
+            "cash": round(float(cash_left), 2),
+            "total_value": round(float(total), 2),
+            "positions": [
+                {
+                    "symbol": symbols[i],
+                    "qty": round(float(position_qty[i]), 6),
+                    "price": round(float(prices[i]), 2),
+                    "value": round(float(values[i]), 2),
+                    "weight": round(float(w[i]), 4),
+                }
+                for i in held
+            ],
+            "risk": metrics,
+        }
+
+    orders = [
+        {
+            "symbol": symbols[i],
+            "action": "BUY" if delta[i] > 0 else "SELL",
+            "qty": round(float(abs(delta[i])), 6),
+            "price": round(float(prices[i]), 2),
+            "value": round(float(abs(delta[i]) * prices[i]), 2),
+        }
+        for i in np.flatnonzero(delta != 0)
+    ]
+
+    return {
+        "before": describe(qty, before_values, cash, totals[0], weights[0], risk[0]),
+        "after": describe(new_qty, after_values, new_cash, totals[1], weights[1], risk[1]),
+        "orders": orders,
+        "feasible": not violations,
+        "violations": violations,
+        "missing_history": [s for s in symbols if histories.get(s) is None],
+    }
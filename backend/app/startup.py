@@ -0,0 +1,78 @@
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Seconds spent on each lazily-loaded dependency, keyed by name
+load_timings = {}
+
+_loaded = {}
+_lock = threading.RLock()  # loaders may depend on other loaders
+
+
+def load_once(name, loader):
+    """Run `loader` the first time `name` is requested and cache its result."""
+    if name in _loaded:
+        return _loaded[name]
+
+    with _lock:
+        if name not in _loaded:
+            start = time.perf_counter()
+            _loaded[name] = loader()
+            load_timings[name] = round(time.perf_counter() - start, 4)
+    return _loaded[name]
+
+
+def get_if_loaded(name):
+    return _loaded.get(name)
+
+
+def get_yfinance():
+    # yfinance pulls in pandas/numpy, which dominates import time
+    return load_once("yfinance", lambda: importlib.import_module("yfinance"))
+
+
+def preload():
+    """Load heavy dependencies up front so forked workers share them copy-on-write."""
+    from .api.symbol_search import get_local_tickers
+    from .fundamentals import get_fundamentals
+
+    get_yfinance()
+    get_local_tickers()
+    get_fundamentals()
+    return dict(load_timings)
+
+
+def profile_imports(mode="preload", limit=20):
+    """
+    Boot the app in a fresh interpreter with `-X importtime` and return the
+    most expensive top-level modules as (module, cumulative_ms) pairs.
+    """
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, STARTUP_MODE=mode)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app; app.create_app()"],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    totals = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header row
+        module = parts[2].strip().split(".")[0]
+        cumulative_us = int(parts[1])
+        # Only the outermost import of a package carries its full cumulative cost
+        totals[module] = max(totals.get(module, 0), cumulative_us)
+
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [(module, round(us / 1000, 1)) for module, us in ranked[:limit]]
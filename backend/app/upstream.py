@@ -0,0 +1,294 @@
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    # Lower values are served first
+    TRADE = 0
+    QUOTE = 1
+    PORTFOLIO = 2
+    BACKGROUND = 3
+
+
+class RateLimitedError(Exception):
+    """Upstream kept answering 429 after all retries."""
+
+
+def is_rate_limited(exc):
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    # yfinance raises its own YFRateLimitError instead of an HTTPError
+    return type(exc).__name__ == "YFRateLimitError" or "Too Many Requests" in str(exc)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """Exponential backoff with equal jitter: half fixed, half random."""
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class TokenBucket:
+    """
+    Token bucket that also owns the single queue of callers waiting for a token.
+
+    Both the scheduler workers and the async fetcher take tokens through
+    request(), so waiting callers are served best priority first no matter
+    which of them asked.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_dispatcher(self):
+        # Threads do not survive fork, so every process starts its own
+        if self._pid == os.getpid():
+            return
+        with self.lock:
+            if self._pid == os.getpid():
+                return
+            self._cond = threading.Condition()
+            self._waiters = []
+            self._seq = itertools.count()
+            threading.Thread(target=self._dispatch, name="token-bucket", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _take(self):
+        """Take a token if one is available; otherwise return seconds until one is."""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def _refund(self):
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._waiters:
+                    self._cond.wait()
+                wait = self._take()
+                if wait > 0:
+                    # A better-priority request may arrive while we sleep
+                    self._cond.wait(timeout=wait)
+                    continue
+                _, _, future = heapq.heappop(self._waiters)
+            if future.set_running_or_notify_cancel():
+                future.set_result(None)
+            else:
+                self._refund()  # the caller gave up waiting
+
+    def request(self, priority=Priority.QUOTE):
+        """Queue for a token; returns a Future that resolves once it is granted."""
+        self._ensure_dispatcher()
+        future = Future()
+        with self._cond:
+            heapq.heappush(self._waiters, (priority, next(self._seq), future))
+            self._cond.notify()
+        return future
+
+    def acquire(self, priority=Priority.QUOTE):
+        self.request(priority).result()
+
+    def waiting(self):
+        if self._pid != os.getpid():
+            return 0
+        with self._cond:
+            return len(self._waiters)
+
+    def pause(self, seconds):
+        # After a 429 nobody should hit upstream until the backoff has elapsed
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+class _Job:
+    def __init__(self, key, fn, priority):
+        self.key = key
+        self.fn = fn
+        self.priority = priority
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+        self.claimed = False
+
+
+class UpstreamScheduler:
+    """
+    Single gate for calls to the market data provider.
+
+    Jobs wait in a priority queue; a worker claims the best one and then waits
+    for a token in the bucket's shared queue (alongside the async fetcher), so
+    bursts of page loads cannot exceed the upstream budget. A claimed job keeps
+    its place in that queue, so at most `workers` jobs can sit ahead of a later,
+    better one from this scheduler. Concurrent requests for the
+    same key share one call, and 429 responses are retried with jittered
+    exponential backoff while the whole bucket pauses.
+    """
+
+    def __init__(self, rate=2.0, burst=5, workers=4, max_retries=4,
+                 base_backoff=1.0, max_backoff=30.0):
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending = {}
+        self._threads = []
+        self._metrics = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "completed": 0,
+            "failed": 0,
+            "rate_limited": 0,
+            "retries": 0,
+            "in_flight": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def _ensure_workers(self):
+        # Threads do not survive fork, so a pre-fork master must not own them
+        if self._pid != os.getpid():
+            self._reset()
+        if self._threads:
+            return
+        with self._cond:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"upstream-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, key, fn, priority=Priority.QUOTE):
+        """Queue `fn` under `key` and return a Future for its result."""
+        self._ensure_workers()
+        with self._cond:
+            job = self._pending.get(key)
+            if job is not None:
+                self._metrics["deduplicated"] += 1
+                if not job.claimed and priority < job.priority:
+                    # Re-push at the better priority; the stale entry is skipped later
+                    job.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), job))
+                    self._cond.notify()
+                return job.future
+
+            job = _Job(key, fn, priority)
+            self._pending[key] = job
+            self._metrics["submitted"] += 1
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._cond.notify()
+            return job.future
+
+    def run(self, key, fn, priority=Priority.QUOTE, timeout=None):
+        return self.submit(key, fn, priority).result(timeout=timeout)
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2].claimed:
+                    heapq.heappop(self._heap)
+                if self._heap:
+                    break
+                self._cond.wait()
+
+            _, _, job = heapq.heappop(self._heap)
+            job.claimed = True
+            self._metrics["in_flight"] += 1
+
+        self.bucket.acquire(job.priority)
+        waited = time.monotonic() - job.enqueued_at
+        with self._cond:
+            self._metrics["wait_seconds_total"] += waited
+            self._metrics["wait_seconds_max"] = max(self._metrics["wait_seconds_max"], waited)
+        return job
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            try:
+                result = self._call_with_backoff(job)
+            except Exception as e:
+                outcome = "failed"
+                job.future.set_exception(e)
+            else:
+                outcome = "completed"
+                job.future.set_result(result)
+            finally:
+                with self._cond:
+                    self._pending.pop(job.key, None)
+                    self._metrics["in_flight"] -= 1
+                    self._metrics[outcome] += 1
+
+    def _call_with_backoff(self, job):
+        attempt = 0
+        while True:
+            try:
+                return job.fn()
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                with self._cond:
+                    self._metrics["rate_limited"] += 1
+                if attempt >= self.max_retries:
+                    raise RateLimitedError(f"Upstream rate limit for {job.key}") from e
+
+                delay = backoff_delay(attempt, self.base_backoff, self.max_backoff)
+                self.bucket.pause(delay)
+                with self._cond:
+                    self._metrics["retries"] += 1
+                time.sleep(delay)
+                # The retry spends a token like any other call
+                self.bucket.acquire(job.priority)
+                attempt += 1
+
+    def stats(self):
+        with self._cond:
+            queued = [job for job in self._pending.values() if not job.claimed]
+            now = time.monotonic()
+            started = self._metrics["completed"] + self._metrics["failed"] + self._metrics["in_flight"]
+            by_priority = {p.name.lower(): 0 for p in Priority}
+            for job in queued:
+                by_priority[Priority(job.priority).name.lower()] += 1
+
+            return {
+                **self._metrics,
+                "wait_seconds_total": round(self._metrics["wait_seconds_total"], 3),
+                "wait_seconds_max": round(self._metrics["wait_seconds_max"], 3),
+                "wait_seconds_avg": round(self._metrics["wait_seconds_total"] / started, 3) if started else 0.0,
+                "queue_depth": len(queued),
+                "queue_depth_by_priority": by_priority,
+                "oldest_queued_seconds": round(max((now - j.enqueued_at for j in queued), default=0.0), 3),
+                "tokens_available": round(self.bucket.tokens, 2),
+                "waiting_for_token": self.bucket.waiting(),
+            }
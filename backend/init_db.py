@@ -1,5 +1,6 @@
 from app import create_app, db
-from app.models import User, Portfolio, Transaction, Holding, ProductType, TransactionType
+from app.models import User, Portfolio, Transaction, ProductType, TransactionType
+from app.holdings_rebuild import rebuild_holdings
 from datetime import datetime, date, timezone
 from decimal import Decimal
 import mysql.connector
@@ -166,71 +167,14 @@ def init_mock_data():
     ]
     db.session.add_all(mock_transactions)
 
-    # Create current holdings reflecting all transactions
-    # These represent the final positions after all trading activity
-    mock_holdings = [
-        Holding(
-            portfolio_id=portfolio.id,
-            product_symbol='AAPL',
-            qty=Decimal('200'),  # 150 + 50 = 200 shares
-            avg_price=Decimal('193.22'),  # Weighted average: (150*190.50 + 50*198.20) / 200
-            last_updated=datetime.now(timezone.utc),
-            product_type=ProductType.STOCKS
-        ),
-        Holding(
-            portfolio_id=portfolio.id,
-            product_symbol='MSFT',
-            qty=Decimal('130'),  # 100 + 30 = 130 shares
-            avg_price=Decimal('428.08'),  # Weighted average: (100*425.00 + 30*438.50) / 130
-            last_updated=datetime.now(timezone.utc),
-            product_type=ProductType.STOCKS
-        ),
-        Holding(
-            portfolio_id=portfolio.id,
-            product_symbol='NVDA',
-            qty=Decimal('50'),   # 75 - 25 = 50 shares
-            avg_price=Decimal('880.00'),  # Original purchase price
-            last_updated=datetime.now(timezone.utc),
-            product_type=ProductType.STOCKS
-        ),
-        Holding(
-            portfolio_id=portfolio.id,
-            product_symbol='GOOGL',
-            qty=Decimal('40'),
-            avg_price=Decimal('175.20'),
-            last_updated=datetime.now(timezone.utc),
-            product_type=ProductType.STOCKS
-        ),
-        Holding(
-            portfolio_id=portfolio.id,
-            product_symbol='TSLA',
-            qty=Decimal('80'),
-            avg_price=Decimal('245.30'),
-            last_updated=datetime.now(timezone.utc),
-            product_type=ProductType.STOCKS
-        ),
-        Holding(
-            portfolio_id=portfolio.id,
-            product_symbol='META',
-            qty=Decimal('40'),   # 60 - 20 = 40 shares
-            avg_price=Decimal('485.75'),  # Original purchase price
-            last_updated=datetime.now(timezone.utc),
-            product_type=ProductType.STOCKS
-        ),
-        Holding(
-            portfolio_id=portfolio.id,
-            product_symbol='AMZN',
-            qty=Decimal('50'),
-            avg_price=Decimal('145.80'),
-            last_updated=datetime.now(timezone.utc),
-            product_type=ProductType.STOCKS
-        )
-    ]
-    db.session.add_all(mock_holdings)
-
     db.session.commit()
+
+    # Derive current holdings from the ledger instead of hand-computing them
+    report = rebuild_holdings(repair=True, portfolio_id=portfolio.id)
+    holdings_count = report["counts"].get("missing", 0)
+
     print("Enhanced mock data with month-long trading history initialized successfully!")
-    print(f"Portfolio contains {len(mock_holdings)} holdings with {len(mock_transactions)} transactions")
+    print(f"Portfolio contains {holdings_count} holdings with {len(mock_transactions)} transactions")
 
 if __name__ == '__main__':
     app = create_app()
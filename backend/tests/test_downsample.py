@@ -0,0 +1,68 @@
+"""
+Behaviour checks for the chart downsamplers.
+
+Run from backend/: python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from app.downsample import downsample, lttb, minmax
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=np.float64) * 60_000
+    y = 100 + np.cumsum(rng.normal(0, 1, n))
+    return x, y
+
+
+@pytest.mark.parametrize("n,points", [(10, 3), (1000, 300), (1001, 7), (100_000, 500)])
+def test_lttb_returns_exactly_points_increasing_indices(n, points):
+    x, y = _series(n)
+    idx = lttb(x, y, points)
+    assert len(idx) == points
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == n - 1
+
+
+def test_lttb_picks_one_index_from_each_bucket():
+    x, y = _series(1000)
+    idx = lttb(x, y, 12)
+    edges = np.linspace(1, 999, 11).astype(np.int64)
+    for i, chosen in enumerate(idx[1:-1]):
+        assert edges[i] <= chosen < edges[i + 1]
+
+
+def test_lttb_keeps_an_isolated_spike():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[437] = 50.0
+    assert 437 in lttb(x, y, 20)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_short_series_are_returned_whole(method):
+    x, y = _series(50)
+    assert np.array_equal(downsample(x, y, 50, method), np.arange(50))
+    assert np.array_equal(downsample(x, y, 300, method), np.arange(50))
+
+
+@pytest.mark.parametrize("n,points", [(1000, 300), (1001, 7), (99_999, 500)])
+def test_minmax_count_and_order(n, points):
+    _, y = _series(n)
+    idx = minmax(y, points)
+    assert len(idx) <= points
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] >= 0 and idx[-1] < n
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    _, y = _series(10_000, seed=3)
+    points = 100
+    idx = set(minmax(y, points).tolist())
+    edges = np.linspace(0, len(y), points // 2 + 1).astype(np.int64)
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        bucket = y[lo:hi]
+        assert lo + int(bucket.argmin()) in idx
+        assert lo + int(bucket.argmax()) in idx
+    assert int(y.argmin()) in idx and int(y.argmax()) in idx
@@ -0,0 +1,117 @@
+"""
+Behaviour checks for the screener's columnar fundamentals table: filters,
+sort order with missing values, paging, and snapshot save/load merging.
+
+Run from backend/: python -m pytest tests
+"""
+import json
+
+import numpy as np
+import pytest
+
+from app.fundamentals import FundamentalsTable
+
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+
+
+@pytest.fixture
+def table():
+    table = FundamentalsTable(SYMBOLS, [f"{s} Inc" for s in SYMBOLS])
+    rows = {
+        "AAA": {"marketCap": 300, "trailingPE": 10, "sector": "Technology"},
+        "BBB": {"marketCap": 100, "trailingPE": None, "sector": "Energy"},
+        "CCC": {"marketCap": None, "trailingPE": 30, "sector": "Technology"},
+        "DDD": {"marketCap": 200, "trailingPE": 20, "sector": "Utilities"},
+    }
+    for symbol, info in rows.items():
+        table.update_from_info(symbol, info, updated_at=1000)
+    return table  # EEE never fetched
+
+
+def _symbols(columns):
+    return columns["symbol"].tolist()
+
+
+@pytest.mark.parametrize("descending,expected", [
+    (True, ["AAA", "DDD", "BBB", "CCC", "EEE"]),
+    (False, ["BBB", "DDD", "AAA", "CCC", "EEE"]),
+])
+def test_missing_values_sort_last_both_ways(table, descending, expected):
+    total, columns = table.screen(sort="market_cap", descending=descending)
+    assert total == 5
+    assert _symbols(columns) == expected
+
+
+def test_missing_values_never_match_a_range(table):
+    total, columns = table.screen(ranges={"pe_ratio": (None, 25)})
+    assert total == 2
+    assert set(_symbols(columns)) == {"AAA", "DDD"}
+
+
+def test_sector_filter_and_range_combine(table):
+    total, columns = table.screen(sectors={"technology"}, ranges={"market_cap": (150, None)})
+    assert total == 1
+    assert _symbols(columns) == ["AAA"]
+
+
+def test_paging_reports_the_full_total(table):
+    total, columns = table.screen(sort="market_cap", offset=1, limit=2)
+    assert total == 5
+    assert _symbols(columns) == ["DDD", "BBB"]
+
+
+def test_text_sort_is_case_insensitive():
+    table = FundamentalsTable(["X", "Y", "Z"], ["beta", "Alpha", "charlie"])
+    _, columns = table.screen(sort="name", descending=False)
+    assert _symbols(columns) == ["Y", "X", "Z"]
+
+
+def test_save_load_round_trip(table, tmp_path):
+    path = tmp_path / "fundamentals.json"
+    table.save(str(path))
+    assert list(tmp_path.iterdir()) == [path]  # no temp file left behind
+
+    loaded = FundamentalsTable(SYMBOLS, [f"{s} Inc" for s in SYMBOLS])
+    loaded.load(str(path))
+    for field in ("market_cap", "pe_ratio", "updated_at"):
+        np.testing.assert_array_equal(loaded.columns[field], table.columns[field])
+    assert loaded.columns["sector"].tolist() == table.columns["sector"].tolist()
+    assert loaded.screen(sectors={"energy"})[0] == 1
+
+
+def test_load_keeps_rows_newer_than_the_snapshot(table, tmp_path):
+    path = tmp_path / "fundamentals.json"
+    table.save(str(path))
+
+    # AAA refreshed after the snapshot was written; BBB is older in memory
+    table.update_from_info("AAA", {"marketCap": 999}, updated_at=2000)
+    table.columns["updated_at"][1] = 500
+    table.columns["market_cap"][1] = -1
+    table.load(str(path))
+
+    assert table.columns["market_cap"][0] == 999
+    assert table.columns["updated_at"][0] == 2000
+    assert table.columns["market_cap"][1] == 100
+    assert table.columns["updated_at"][1] == 1000
+
+
+def test_load_skips_symbols_no_longer_listed(table, tmp_path):
+    path = tmp_path / "fundamentals.json"
+    table.save(str(path))
+    snapshot = json.loads(path.read_text())
+    snapshot["symbol"][0] = "GONE"
+    path.write_text(json.dumps(snapshot))
+
+    fresh = FundamentalsTable(SYMBOLS, [f"{s} Inc" for s in SYMBOLS])
+    fresh.load(str(path))
+    assert np.isnan(fresh.columns["market_cap"][0])
+    assert fresh.columns["market_cap"][3] == 200
+
+
+def test_reload_if_changed_picks_up_another_writer(table, tmp_path):
+    path = str(tmp_path / "fundamentals.json")
+    reader = FundamentalsTable(SYMBOLS, [f"{s} Inc" for s in SYMBOLS])
+    reader.reload_if_changed(path)  # nothing saved yet
+    table.save(path)
+    reader.reload_if_changed(path)
+    assert reader.columns["market_cap"][0] == 300
@@ -0,0 +1,124 @@
+"""
+Check the vectorised ledger replay against a plain row-by-row replay that
+follows TransactionResource's buy/sell rules.
+
+Run from backend/: python -m pytest tests
+"""
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.holdings_rebuild import QTY_SCALE, replay_ledger
+from app.models import ProductType
+
+
+def reference_replay(rows):
+    """{(portfolio_id, symbol): (qty, avg_price, oversold)} from (pid, symbol, type, qty, price) rows."""
+    positions = {}
+    for pid, symbol, kind, qty, price in rows:
+        # Decimal, like the Numeric columns TransactionResource works with
+        qty, price = Decimal(str(qty)), Decimal(str(price))
+        held, avg, oversold = positions.get((pid, symbol), (Decimal(0), Decimal(0), False))
+        if kind == "BUY":
+            if held > 0:
+                avg = (avg * held + price * qty) / (held + qty)
+            else:
+                avg = price
+            held += qty
+        else:
+            held -= qty
+            oversold = oversold or held < 0
+            if held == 0:
+                avg = Decimal(0)
+        positions[(pid, symbol)] = (held, avg, oversold)
+    return positions
+
+
+def _frame(rows):
+    return pd.DataFrame(
+        [(pid, symbol, kind, qty, price, ProductType.STOCKS.value) for pid, symbol, kind, qty, price in rows],
+        columns=["portfolio_id", "product_symbol", "type", "qty", "price", "product_type"],
+    )
+
+
+def _assert_matches(rows):
+    expected = reference_replay(rows)
+    result = replay_ledger(_frame(rows))
+    assert len(result) == len(expected)
+    for row in result.itertuples(index=False):
+        qty, avg, oversold = expected[(row.portfolio_id, row.product_symbol)]
+        assert bool(row.oversold) == oversold
+        assert row.qty_units == int(qty * QTY_SCALE)
+        if not oversold and qty > 0:
+            assert row.avg_price == pytest.approx(float(avg), rel=1e-12, abs=1e-9)
+
+
+def test_buy_sell_buy():
+    _assert_matches([
+        (1, "AAPL", "BUY", 10, 100.0),
+        (1, "AAPL", "SELL", 4, 120.0),
+        (1, "AAPL", "BUY", 6, 90.0),
+    ])
+
+
+def test_sell_to_zero_then_rebuy_starts_new_average():
+    rows = [
+        (1, "MSFT", "BUY", 5, 300.0),
+        (1, "MSFT", "BUY", 5, 320.0),
+        (1, "MSFT", "SELL", 10, 350.0),
+        (1, "MSFT", "BUY", 2, 280.0),
+        (1, "MSFT", "BUY", 2, 290.0),
+    ]
+    _assert_matches(rows)
+    assert replay_ledger(_frame(rows)).loc[0, "avg_price"] == pytest.approx(285.0)
+
+
+def test_fully_closed_position_has_zero_quantity():
+    _assert_matches([
+        (1, "TSLA", "BUY", 3, 200.0),
+        (1, "TSLA", "SELL", 3, 210.0),
+    ])
+
+
+def test_oversold_is_flagged():
+    rows = [
+        (1, "NVDA", "BUY", 2, 400.0),
+        (1, "NVDA", "SELL", 5, 410.0),
+        (1, "NVDA", "BUY", 10, 420.0),
+    ]
+    _assert_matches(rows)
+    assert replay_ledger(_frame(rows)).loc[0, "oversold"]
+
+
+def test_groups_do_not_leak_into_each_other():
+    _assert_matches([
+        (1, "AAPL", "BUY", 10, 100.0),
+        (1, "MSFT", "BUY", 1, 300.0),
+        (2, "AAPL", "BUY", 3, 150.0),
+        (2, "AAPL", "SELL", 3, 160.0),
+        (3, "AAPL", "SELL", 1, 100.0),
+    ])
+
+
+def test_random_ledgers_match_reference():
+    rng = np.random.default_rng(7)
+    rows = []
+    for pid in range(1, 40):
+        for symbol in ("AAA", "BBB", "CCC"):
+            held = 0.0
+            for _ in range(rng.integers(1, 60)):
+                qty = round(float(rng.uniform(0.001, 50)), 6)
+                price = round(float(rng.uniform(1, 500)), 6)
+                roll = rng.random()
+                if held > 0 and roll < 0.1:
+                    qty = held  # close the position exactly
+                if held > 0 and roll < 0.4:
+                    qty = min(qty, held)
+                    rows.append((pid, symbol, "SELL", qty, price))
+                    held = round(held - qty, 6)
+                else:
+                    rows.append((pid, symbol, "BUY", qty, price))
+                    held = round(held + qty, 6)
+    _assert_matches(rows)
@@ -0,0 +1,119 @@
+"""
+Behaviour checks for the what-if engine: target orders, cash, feasibility
+and risk metrics.
+
+Run from backend/: python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.simulation import orders_for_targets, simulate
+
+SYMBOLS = ["AAA", "BBB"]
+
+
+def _closes(values, start="2024-01-01"):
+    return pd.Series(values, index=pd.date_range(start, periods=len(values), freq="B"), dtype="float64")
+
+
+def test_whole_share_orders_round_down_and_stay_funded():
+    qty = np.array([10.0, 0.0])
+    prices = np.array([30.0, 7.0])
+    # Total value 300 + 100 cash = 400, so each target is 200
+    delta = orders_for_targets(qty, prices, 100.0, np.array([0.5, 0.5]))
+    assert delta.tolist() == [-4.0, 28.0]  # -3.33 and 28.57 rounded down
+    assert np.all((qty + delta) * prices <= 200.0)
+    assert 100.0 - delta @ prices >= 0
+
+
+def test_whole_share_orders_leave_exact_targets_alone():
+    qty = np.array([10.0, 0.0])
+    prices = np.array([20.0, 10.0])
+    delta = orders_for_targets(qty, prices, 200.0, np.array([0.5, 0.5]))
+    assert delta.tolist() == [0.0, 20.0]
+
+
+def test_float_noise_does_not_cost_a_share():
+    # The position is already at its 10% target, but the delta comes out as -1.1e-16
+    qty = np.array([1.0])
+    delta = orders_for_targets(qty, np.array([3.3]), 29.699999999999992, np.array([0.1]))
+    assert delta.tolist() == [0.0]
+
+
+def test_fractional_orders_hit_targets_exactly():
+    qty = np.array([10.0, 0.0])
+    prices = np.array([30.0, 7.0])
+    delta = orders_for_targets(qty, prices, 100.0, np.array([0.25, 0.5]), fractional=True)
+    np.testing.assert_allclose((qty + delta) * prices, [100.0, 200.0])
+
+
+def test_zero_weight_sells_everything():
+    qty = np.array([4.0, 2.0])
+    prices = np.array([10.0, 5.0])
+    delta = orders_for_targets(qty, prices, 0.0, np.array([0.0, 1.0]))
+    assert delta.tolist() == [-4.0, 8.0]
+
+
+def test_simulate_moves_cash_and_positions():
+    qty = np.array([10.0, 0.0])
+    prices = np.array([30.0, 7.0])
+    result = simulate(SYMBOLS, qty, prices, 100.0, {}, np.array([-4.0, 28.0]))
+
+    assert result["feasible"] and result["violations"] == []
+    assert result["before"]["cash"] == 100.0
+    assert result["after"]["cash"] == 100.0 + 120.0 - 196.0
+    assert result["before"]["total_value"] == result["after"]["total_value"] == 400.0
+    assert [p["symbol"] for p in result["after"]["positions"]] == ["AAA", "BBB"]
+    assert result["orders"] == [
+        {"symbol": "AAA", "action": "SELL", "qty": 4.0, "price": 30.0, "value": 120.0},
+        {"symbol": "BBB", "action": "BUY", "qty": 28.0, "price": 7.0, "value": 196.0},
+    ]
+    assert result["missing_history"] == SYMBOLS
+
+
+def test_simulate_reports_overselling_and_overspending():
+    qty = np.array([1.0, 0.0])
+    prices = np.array([30.0, 7.0])
+    # Selling 2 AAA (60) plus 10 cash cannot pay for 11 BBB (77)
+    result = simulate(SYMBOLS, qty, prices, 10.0, {}, np.array([-2.0, 11.0]))
+    assert not result["feasible"]
+    assert result["violations"] == ["Not enough shares of AAA to sell", "Insufficient balance"]
+
+
+def test_closed_positions_drop_out_and_untouched_symbols_have_no_order():
+    qty = np.array([5.0, 2.0])
+    prices = np.array([10.0, 20.0])
+    result = simulate(SYMBOLS, qty, prices, 0.0, {}, np.array([-5.0, 0.0]))
+    assert [p["symbol"] for p in result["after"]["positions"]] == ["BBB"]
+    assert [o["symbol"] for o in result["orders"]] == ["AAA"]
+
+
+def test_risk_uses_the_lookback_window_on_common_dates():
+    rng = np.random.default_rng(1)
+    aaa = _closes(100 * np.cumprod(1 + rng.normal(0, 0.01, 300)))
+    histories = {
+        "AAA": aaa,
+        # Starts later, so only the overlap counts
+        "BBB": _closes(50 * np.cumprod(1 + rng.normal(0, 0.02, 200)), start="2024-05-20"),
+    }
+    qty = np.array([10.0, 0.0])
+    prices = np.array([100.0, 50.0])
+    result = simulate(SYMBOLS, qty, prices, 0.0, histories, np.array([-5.0, 10.0]), lookback=60)
+
+    before, after = result["before"]["risk"], result["after"]["risk"]
+    assert before["days"] == after["days"] == 60
+    # Fully in AAA before: its own volatility over the last 60 returns
+    expected = aaa.pct_change().iloc[-60:].std() * np.sqrt(252)
+    assert before["annual_volatility"] == pytest.approx(expected, abs=1e-4)
+    assert after["annual_volatility"] != before["annual_volatility"]
+    assert before["max_drawdown"] >= 0
+    assert result["missing_history"] == []
+
+
+def test_all_cash_account_has_zero_risk():
+    histories = {"AAA": _closes([100, 101, 99, 102, 103]), "BBB": _closes([50, 49, 51, 52, 50])}
+    result = simulate(SYMBOLS, np.zeros(2), np.array([100.0, 50.0]), 1000.0, histories, np.zeros(2))
+    risk = result["after"]["risk"]
+    assert risk["annual_volatility"] == 0 and risk["sharpe_ratio"] is None
+    assert result["orders"] == []
@@ -0,0 +1,156 @@
+"""
+Behaviour checks for the upstream token bucket and scheduler: priority order,
+deduplication and 429 backoff.
+
+Run from backend/: python -m pytest tests
+"""
+import threading
+import time
+
+import pytest
+
+from app.upstream import Priority, RateLimitedError, TokenBucket, UpstreamScheduler
+
+
+class FakeResponse:
+    status_code = 429
+
+
+class TooManyRequests(Exception):
+    response = FakeResponse()
+
+
+def _empty(bucket):
+    bucket.tokens = 0
+    bucket.updated = time.monotonic()
+
+
+def test_bucket_grants_tokens_best_priority_first():
+    bucket = TokenBucket(rate=20, capacity=1)
+    _empty(bucket)
+    order = []
+    futures = []
+    for priority in (Priority.BACKGROUND, Priority.PORTFOLIO, Priority.QUOTE, Priority.TRADE):
+        future = bucket.request(priority)
+        future.add_done_callback(lambda _, p=priority: order.append(p))
+        futures.append(future)
+    for future in futures:
+        future.result(timeout=5)
+    assert order == [Priority.TRADE, Priority.QUOTE, Priority.PORTFOLIO, Priority.BACKGROUND]
+
+
+def test_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=2)
+    start = time.monotonic()
+    for _ in range(12):
+        bucket.acquire()
+    # Two from the burst, then ten at 50/s
+    assert time.monotonic() - start >= 0.18
+
+
+def test_bucket_pause_holds_every_caller():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.2)
+    start = time.monotonic()
+    bucket.acquire(Priority.TRADE)
+    assert time.monotonic() - start >= 0.18
+
+
+def test_cancelled_request_does_not_spend_a_token():
+    bucket = TokenBucket(rate=5, capacity=1)
+    _empty(bucket)
+    start = time.monotonic()
+    cancelled = bucket.request(Priority.TRADE)
+    assert cancelled.cancel()
+    bucket.request(Priority.QUOTE).result(timeout=5)
+    # The first token (after 0.2s) goes to QUOTE instead of waiting for a second one
+    assert time.monotonic() - start < 0.35
+
+
+def test_scheduler_runs_queued_jobs_in_priority_order():
+    scheduler = UpstreamScheduler(rate=1000, burst=1000, workers=1)
+    gate = threading.Event()
+    order = []
+    blocker = scheduler.submit("blocker", gate.wait)
+    time.sleep(0.05)  # the only worker is now busy
+
+    futures = [
+        scheduler.submit(name, lambda name=name: order.append(name), priority)
+        for name, priority in [
+            ("background", Priority.BACKGROUND),
+            ("portfolio", Priority.PORTFOLIO),
+            ("trade", Priority.TRADE),
+            ("quote", Priority.QUOTE),
+        ]
+    ]
+    gate.set()
+    blocker.result(timeout=5)
+    for future in futures:
+        future.result(timeout=5)
+    assert order == ["trade", "quote", "portfolio", "background"]
+
+
+def test_scheduler_deduplicates_pending_keys():
+    scheduler = UpstreamScheduler(rate=1000, burst=1000, workers=1)
+    gate = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        gate.wait()
+        return "data"
+
+    first = scheduler.submit(("info", "AAPL"), fetch)
+    second = scheduler.submit(("info", "AAPL"), fetch)
+    assert first is second
+    gate.set()
+    assert first.result(timeout=5) == "data"
+    assert calls == [1]
+    assert scheduler.stats()["deduplicated"] == 1
+
+    # Once finished, the key can be fetched again
+    assert scheduler.run(("info", "AAPL"), lambda: "fresh", timeout=5) == "fresh"
+
+
+def test_scheduler_retries_429_with_backoff():
+    scheduler = UpstreamScheduler(rate=1000, burst=1000, workers=1, max_retries=4,
+                                  base_backoff=0.01, max_backoff=0.02)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise TooManyRequests("Too Many Requests")
+        return "ok"
+
+    assert scheduler.run("flaky", flaky, timeout=5) == "ok"
+    stats = scheduler.stats()
+    assert len(attempts) == 3
+    assert stats["rate_limited"] == 2 and stats["retries"] == 2
+
+
+def test_scheduler_gives_up_after_max_retries():
+    scheduler = UpstreamScheduler(rate=1000, burst=1000, workers=1, max_retries=2,
+                                  base_backoff=0.01, max_backoff=0.02)
+    attempts = []
+
+    def limited():
+        attempts.append(1)
+        raise TooManyRequests("Too Many Requests")
+
+    with pytest.raises(RateLimitedError):
+        scheduler.run("limited", limited, timeout=5)
+    assert len(attempts) == 3
+
+
+def test_scheduler_does_not_retry_other_errors():
+    scheduler = UpstreamScheduler(rate=1000, burst=1000, workers=1, base_backoff=0.01)
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad symbol")
+
+    with pytest.raises(ValueError):
+        scheduler.run("broken", broken, timeout=5)
+    assert attempts == [1]